@@ -0,0 +1,355 @@
+"""Benchmark harness for the conversion engine.
+
+Generates a reproducible synthetic corpus (many small READMEs, a few huge
+ones, code-heavy, table-heavy and image-heavy files), converts it with
+readme_engine and reports the time spent reading, parsing, highlighting,
+embedding images, templating and writing for every kind of file.  Results
+are saved as JSON; pass an earlier result as --baseline to fail the run
+when a category got slower than --threshold allows.
+
+--startup instead measures how long a scripted one-file conversion takes
+from process start to exit, and fails when the median exceeds the startup
+budget or when the command line path imports GUI modules.
+
+Usage::
+
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --threshold 0.1
+    python benchmark.py --startup --startup-budget 0.4
+"""
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import readme_engine
+from highlight_cache import HIGHLIGHT_CACHE
+
+RESULTS_VERSION = 1
+BASE_DIR = Path(__file__).resolve().parent
+# Seconds a one-file command line conversion may take from start to exit
+STARTUP_BUDGET = 0.4
+# Modules the command line path must never import
+GUI_MODULES = ('tkinter', 'tkinterdnd2', 'readme_gui')
+STAGES = ('read', 'parse', 'highlight', 'images', 'template', 'write')
+
+# Files per category at scale 1.0, and their approximate size in bytes
+CORPUS = {
+    'small': (200, 2 * 1024),
+    'huge': (2, 1024 * 1024),
+    'code': (20, 64 * 1024),
+    'tables': (20, 64 * 1024),
+    'images': (20, 8 * 1024),
+}
+
+WORDS = (
+    'install configure build render theme export convert markdown table '
+    'release option server module cache stream header section example '
+    'default value output input file path command user project support'
+).split()
+
+CODE_SAMPLES = {
+    'python': 'def {name}(items):\n    return [item * 2 for item in items if item]\n',
+    'javascript': 'function {name}(items) {{\n  return items.filter(Boolean).map(x => x * 2);\n}}\n',
+    'bash': 'for f in *.md; do\n  python readme_engine.py "$f" --out {name}/\ndone\n',
+    'json': '{{"name": "{name}", "jobs": 4, "options": {{"toc": true}}}}\n',
+    'c': 'int {name}(int *items, int n) {{\n  int s = 0;\n  for (int i = 0; i < n; i++) s += items[i];\n  return s;\n}}\n',
+}
+
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _paragraph(rng):
+    text = ' '.join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+    # Sprinkle inline markup so the inline patterns have work to do
+    return text.replace(' cache ', ' **cache** ').replace(' file ', ' `file` ') + '\n\n'
+
+
+def _code_block(rng, index):
+    lang = rng.choice(sorted(CODE_SAMPLES))
+    body = CODE_SAMPLES[lang].format(name=f"{rng.choice(WORDS)}_{index}")
+    return f"```{lang}\n{body * rng.randint(1, 4)}```\n\n"
+
+
+def _table(rng, rows):
+    lines = ['| Name | Value | Description |', '| --- | ---: | --- |']
+    for row in range(rows):
+        lines.append(f"| {rng.choice(WORDS)}_{row} | {rng.randint(0, 10 ** 6)} | "
+                     f"{_sentence(rng, 6)} |")
+    return '\n'.join(lines) + '\n\n'
+
+
+def _png(rng, width, height):
+    """Return a valid, incompressible RGB PNG"""
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    raw = b''.join(b'\x00' + rng.randbytes(width * 3) for _ in range(height))
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 1))
+            + chunk(b'IEND', b''))
+
+
+def _document(rng, kind, size, index, images):
+    parts = [f"# {kind.title()} document {index}\n\n", _paragraph(rng)]
+    length = sum(map(len, parts))
+    section = 0
+    while length < size:
+        section += 1
+        block = [f"## {_sentence(rng, 3)[:-1]}\n\n", _paragraph(rng)]
+        if kind == 'code' or (kind == 'huge' and section % 3 == 0):
+            block.extend(_code_block(rng, section) for _ in range(3))
+        if kind == 'tables' or (kind == 'huge' and section % 5 == 0):
+            block.append(_table(rng, 20))
+        if kind == 'images':
+            for image in rng.sample(images, 3):
+                block.append(f"![{image}](img/{image})\n\n")
+        if kind == 'small' and section % 2 == 0:
+            block.append(f"- [{rng.choice(WORDS)}](https://example.com/{section})\n"
+                         f"- {_sentence(rng, 5)}\n\n")
+        parts.extend(block)
+        length += sum(map(len, block))
+    return ''.join(parts)
+
+
+def generate_corpus(directory, seed=0, scale=1.0):
+    """Write a reproducible corpus; returns {category: [paths]}
+
+    The same seed and scale always produce byte-identical files.
+    """
+    directory = Path(directory)
+    rng = random.Random(seed)
+    images = []
+    image_dir = directory / 'images' / 'img'
+    image_dir.mkdir(parents=True, exist_ok=True)
+    # A shared logo plus photos on both sides of the inline size limit
+    for name, (width, height) in (('logo.png', (24, 24)), ('icon.png', (48, 32)),
+                                  ('diagram.png', (160, 120)), ('photo.png', (320, 240))):
+        (image_dir / name).write_bytes(_png(rng, width, height))
+        images.append(name)
+
+    corpus = {}
+    for kind, (count, size) in CORPUS.items():
+        target = directory / kind
+        target.mkdir(parents=True, exist_ok=True)
+        count = max(1, round(count * scale))
+        paths = []
+        for index in range(count):
+            path = target / f"{kind}_{index:04d}.md"
+            path.write_text(_document(rng, kind, int(size * scale) if kind == 'huge' else size,
+                                      index, images), encoding='utf-8')
+            paths.append(path)
+        corpus[kind] = paths
+    return corpus
+
+
+def run_category(paths, output_dir, options):
+    """Convert paths once; returns summed stage timings and wall time"""
+    stages = dict.fromkeys(STAGES, 0.0)
+    start = time.perf_counter()
+    for path in paths:
+        stats = {}
+        readme_engine.convert_readme_to_html(path, output_dir, options=options, stats=stats)
+        for stage, seconds in stats.get('timings', {}).items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+    return stages, time.perf_counter() - start
+
+
+def run_benchmark(corpus, work_dir, repeat=3, cold=False, options=None):
+    """Run every category repeat times and return the results dict
+
+    Timings are medians over the repetitions.  The highlight cache is
+    moved into work_dir so the user's cache neither helps nor grows; with
+    cold=True it is also emptied before every repetition.
+    """
+    options = options or readme_engine.export_options(readme_engine.DEFAULT_PREFERENCES)
+    output_dir = Path(work_dir) / 'out'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = Path(work_dir) / 'highlight.sqlite3'
+    HIGHLIGHT_CACHE.reset(cache_path)
+
+    categories = {}
+    for kind, paths in corpus.items():
+        runs = []
+        for _ in range(repeat):
+            if cold:
+                HIGHLIGHT_CACHE.reset()
+                if cache_path.exists():
+                    cache_path.unlink()
+            runs.append(run_category(paths, output_dir, options))
+        categories[kind] = {
+            'files': len(paths),
+            'bytes': sum(path.stat().st_size for path in paths),
+            'stages': {stage: statistics.median(run[0][stage] for run in runs)
+                       for stage in runs[0][0]},
+            'total': statistics.median(run[1] for run in runs),
+        }
+
+    return {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'cold': cold,
+        'categories': categories,
+        'total': sum(category['total'] for category in categories.values()),
+    }
+
+
+def measure_startup(work_dir, runs=10):
+    """Time scripted one-file conversions through readme_converter.py
+
+    Every run starts a fresh interpreter, the way build scripts call the
+    tool, and converts a tiny README with --force.
+    """
+    work_dir = Path(work_dir)
+    source = work_dir / 'startup.md'
+    source.write_text('# Startup\n\nA *tiny* README.\n', encoding='utf-8')
+    command = [sys.executable, str(BASE_DIR / 'readme_converter.py'), str(source),
+               '--out', str(work_dir / 'startup-out'), '--force']
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+
+    probe = ('import sys; sys.argv = ["readme_converter.py", "--help"]; '
+             'import readme_converter, readme_engine; '
+             'print(" ".join(sorted(sys.modules)))')
+    modules = subprocess.run([sys.executable, '-c', probe], cwd=BASE_DIR, check=True,
+                             capture_output=True, text=True).stdout.split()
+    return {
+        'runs': runs,
+        'min': min(times),
+        'median': statistics.median(times),
+        'max': max(times),
+        'gui_modules': [name for name in GUI_MODULES if name in modules],
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return a list of (category, old, new) totals that regressed"""
+    regressions = []
+    for kind, category in results['categories'].items():
+        previous = baseline.get('categories', {}).get(kind)
+        if previous and category['total'] > previous['total'] * (1 + threshold):
+            regressions.append((kind, previous['total'], category['total']))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    header = f"{'category':<10}{'files':>7}" + ''.join(f"{s:>11}" for s in STAGES) + f"{'total':>11}"
+    print(header)
+    for kind, category in results['categories'].items():
+        row = f"{kind:<10}{category['files']:>7}"
+        row += ''.join(f"{category['stages'].get(stage, 0.0) * 1000:>9.1f}ms" for stage in STAGES)
+        row += f"{category['total'] * 1000:>9.1f}ms"
+        previous = (baseline or {}).get('categories', {}).get(kind)
+        if previous and previous['total']:
+            row += f"  {category['total'] / previous['total'] - 1:+.1%}"
+        print(row)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='benchmark',
+        description='Benchmark README conversion on a synthetic corpus.'
+    )
+    parser.add_argument('--corpus', help='directory to generate the corpus in '
+                                         '(default: a temporary directory)')
+    parser.add_argument('--seed', type=int, default=0, help='corpus random seed (default: 0)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='corpus size multiplier (default: 1.0)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='repetitions per category; medians are reported (default: 3)')
+    parser.add_argument('--cold', action='store_true',
+                        help='empty the highlight cache before every repetition')
+    parser.add_argument('-o', '--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='earlier results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed slowdown per category against the baseline '
+                             '(default: 0.10, i.e. 10%%)')
+    parser.add_argument('--startup', action='store_true',
+                        help='measure command line startup instead of conversion')
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET,
+                        help='median seconds a one-file conversion may take '
+                             f'(default: {STARTUP_BUDGET})')
+    return parser
+
+
+def run_startup(args):
+    work_dir = Path(tempfile.mkdtemp(prefix='readme-startup-'))
+    try:
+        startup = measure_startup(work_dir, max(args.repeat, 5))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(f"Startup: min {startup['min'] * 1000:.0f}ms, median {startup['median'] * 1000:.0f}ms, "
+          f"max {startup['max'] * 1000:.0f}ms over {startup['runs']} runs "
+          f"(budget {args.startup_budget * 1000:.0f}ms)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'version': RESULTS_VERSION, 'startup': startup,
+                       'budget': args.startup_budget}, f, indent=2, sort_keys=True)
+
+    failed = False
+    if startup['gui_modules']:
+        print(f"Command line path imports GUI modules: {', '.join(startup['gui_modules'])}",
+              file=sys.stderr)
+        failed = True
+    if startup['median'] > args.startup_budget:
+        print("Startup is over budget", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.startup:
+        return run_startup(args)
+    work_dir = Path(tempfile.mkdtemp(prefix='readme-bench-'))
+    try:
+        corpus_dir = Path(args.corpus) if args.corpus else work_dir / 'corpus'
+        corpus = generate_corpus(corpus_dir, args.seed, args.scale)
+        results = run_benchmark(corpus, work_dir, args.repeat, args.cold)
+        results.update(seed=args.seed, scale=args.scale)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if baseline is None:
+        return 0
+    if (baseline.get('seed'), baseline.get('scale')) != (args.seed, args.scale):
+        print("Baseline was run on a different corpus; not comparing", file=sys.stderr)
+        return 2
+    regressions = compare(results, baseline, args.threshold)
+    for kind, old, new in regressions:
+        print(f"Regression in {kind}: {old * 1000:.1f}ms -> {new * 1000:.1f}ms "
+              f"(threshold {args.threshold:.0%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
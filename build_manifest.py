@@ -0,0 +1,132 @@
+"""Persistent build manifest used to skip unchanged files in a batch.
+
+The manifest lives in the output directory and maps every converted source
+file to the hash of its content and the build key it was rendered with.  The
+build key covers everything else that shapes the output (stylesheet, HTML
+template, theme JavaScript and export options), so changing any of them
+rebuilds every page.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+MANIFEST_NAME = '.readme-manifest.json'
+# Bumped when pages built by older versions must be rebuilt (2: pages could
+# embed files from outside their tree)
+MANIFEST_VERSION = 2
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Tracks which sources are up to date in one output directory"""
+
+    def __init__(self, output_dir, build_key, force=False):
+        self.path = Path(output_dir) / MANIFEST_NAME
+        self.build_key = build_key
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._files = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if data.get('version') != MANIFEST_VERSION:
+            return {}
+        return data.get('files', {})
+
+    @staticmethod
+    def _key(source):
+        return str(Path(source).resolve())
+
+    def check(self, source):
+        """Return (up_to_date, entry) for a source file
+
+        The entry must be passed back to record() once the file has been
+        converted.  The content is only hashed when the size or modification
+        time differs from the recorded one.
+        """
+        st = os.stat(source)
+        entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'build_key': self.build_key}
+        with self._lock:
+            previous = self._files.get(self._key(source))
+
+        fresh = False
+        if previous and not self.force and previous.get('build_key') == self.build_key:
+            if (previous['size'], previous['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+                entry['source_hash'] = previous['source_hash']
+            else:
+                entry['source_hash'] = hash_file(source)
+            fresh = (
+                entry['source_hash'] == previous['source_hash']
+                and os.path.exists(previous['output'])
+                and self._dependencies_unchanged(previous.get('dependencies', {}))
+            )
+            if fresh:
+                entry['output'] = previous['output']
+                self.record(source, entry, dependencies=previous.get('dependencies'))
+        else:
+            entry['source_hash'] = hash_file(source)
+
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return fresh, entry
+
+    @staticmethod
+    def _dependencies_unchanged(dependencies):
+        """Check files a page embeds, such as images, by size and mtime"""
+        for path, (size, mtime_ns) in dependencies.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                return False
+        return True
+
+    def record(self, source, entry, output=None, dependencies=None):
+        """Remember that source was converted to output
+
+        dependencies maps other files the output was built from to their
+        [size, mtime_ns]; a change to any of them makes the source stale.
+        """
+        if output is not None:
+            entry = dict(entry, output=str(Path(output).resolve()))
+        if dependencies:
+            entry = dict(entry, dependencies=dependencies)
+        with self._lock:
+            self._files[self._key(source)] = entry
+
+    def forget(self, source):
+        """Drop a source, e.g. after its conversion failed"""
+        with self._lock:
+            self._files.pop(self._key(source), None)
+
+    def save(self):
+        """Write the manifest atomically next to the outputs"""
+        with self._lock:
+            data = {'version': MANIFEST_VERSION, 'files': self._files}
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def summary(self):
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,122 @@
+"""Indexed list of the files queued for conversion.
+
+FileList is the source of truth for the GUI's batch list.  Paths are kept
+in insertion order with an index on their normalized form, so adding a
+file is O(1) and duplicates are dropped however many files are dropped at
+once.  Each entry carries its conversion state; views only read the rows
+they draw and redraw when the list's version changes.
+"""
+import os
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+STATES = (PENDING, DONE, FAILED, SKIPPED)
+
+
+def normalize_path(path):
+    """Key used to spot the same file added twice"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+class FileList:
+    """Ordered, de-duplicated file paths with a per-file conversion state"""
+
+    def __init__(self, paths=()):
+        self._paths = []
+        self._states = []
+        self._errors = {}
+        self._index = {}
+        # Bumped on every change so views know when to redraw
+        self.version = 0
+        self.add(paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __iter__(self):
+        return iter(list(self._paths))
+
+    def __getitem__(self, position):
+        """Return (path, state, error) of the entry at position"""
+        path = self._paths[position]
+        return path, self._states[position], self._errors.get(position)
+
+    def __contains__(self, path):
+        return normalize_path(path) in self._index
+
+    def paths(self):
+        return list(self._paths)
+
+    def index(self, path):
+        """Position of path, or None if it is not in the list"""
+        return self._index.get(normalize_path(path))
+
+    def add(self, paths):
+        """Append paths that are not listed yet; returns the ones added"""
+        added = []
+        for path in paths:
+            path = str(path)
+            key = normalize_path(path)
+            if not path or key in self._index:
+                continue
+            self._index[key] = len(self._paths)
+            self._paths.append(path)
+            self._states.append(PENDING)
+            added.append(path)
+        if added:
+            self.version += 1
+        return added
+
+    def remove(self, positions):
+        """Remove the entries at positions; returns how many were removed"""
+        drop = {p for p in positions if 0 <= p < len(self._paths)}
+        if not drop:
+            return 0
+        kept = [p for p in range(len(self._paths)) if p not in drop]
+        errors = {}
+        for new, old in enumerate(kept):
+            if old in self._errors:
+                errors[new] = self._errors[old]
+        self._paths = [self._paths[p] for p in kept]
+        self._states = [self._states[p] for p in kept]
+        self._errors = errors
+        self._index = {normalize_path(path): p for p, path in enumerate(self._paths)}
+        self.version += 1
+        return len(drop)
+
+    def clear(self):
+        self._paths.clear()
+        self._states.clear()
+        self._errors.clear()
+        self._index.clear()
+        self.version += 1
+
+    def set_state(self, path, state, error=None):
+        """Record the outcome for path; unknown paths are ignored"""
+        if state not in STATES:
+            raise ValueError(f"Unknown file state: {state}")
+        position = self.index(path)
+        if position is None:
+            return False
+        self._states[position] = state
+        if error:
+            self._errors[position] = error
+        else:
+            self._errors.pop(position, None)
+        self.version += 1
+        return True
+
+    def reset_states(self):
+        """Mark every entry as pending again, before a new run"""
+        self._states = [PENDING] * len(self._paths)
+        self._errors.clear()
+        self.version += 1
+
+    def counts(self):
+        """Number of entries in each state"""
+        counts = dict.fromkeys(STATES, 0)
+        for state in self._states:
+            counts[state] += 1
+        return counts
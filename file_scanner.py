@@ -0,0 +1,236 @@
+"""Recursive discovery of Markdown files in folders.
+
+Folders are walked with os.scandir() by a small thread pool, one task per
+directory, and files are yielded as soon as they are found, so a batch
+conversion fed by scan() starts converting while the walk goes on.  Files
+are matched against include and exclude globs and the .gitignore files of
+the scanned tree.  Globs follow .gitignore syntax: a pattern without a
+slash matches a name at any depth, ``**`` matches any number of folders.
+"""
+import os
+import queue
+import re
+import threading
+
+DEFAULT_INCLUDE = ('*.md', '*.markdown')
+DEFAULT_EXCLUDE = ('.git', 'node_modules')
+# Directory listing is I/O bound, so more threads than CPUs pay off
+SCAN_WORKERS = 8
+GITIGNORE_NAME = '.gitignore'
+
+_IGNORE_CASE = os.path.normcase('A') == 'a'
+_DONE = object()
+
+
+def _translate(pattern):
+    """Regex source for a .gitignore style pattern matched on a relative path"""
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            parts.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    prefix = '' if anchored else '(?:.*/)?'
+    return f"{prefix}{''.join(parts)}"
+
+
+class PatternSet:
+    """Ordered .gitignore style rules; the last matching rule wins"""
+
+    def __init__(self, patterns=(), base=''):
+        self.base = base
+        self.rules = []
+        for line in patterns:
+            line = line.rstrip('\n').rstrip(' ')
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate or line.startswith('\\!') or line.startswith('\\#'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            regex = re.compile(_translate(line), re.IGNORECASE if _IGNORE_CASE else 0)
+            self.rules.append((regex, negate, dir_only))
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def match(self, rel_path, is_dir=False):
+        """True, False, or None when no rule applies to rel_path"""
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(rel_path):
+                result = not negate
+        return result
+
+
+def load_gitignore(directory, base=''):
+    """Rules of directory's .gitignore, or None if it has none"""
+    try:
+        with open(os.path.join(directory, GITIGNORE_NAME), 'r', encoding='utf-8',
+                  errors='replace') as f:
+            rules = PatternSet(f, base)
+    except OSError:
+        return None
+    return rules or None
+
+
+class DirectoryScanner:
+    """Finds the files to convert below folders, walking them in parallel"""
+
+    def __init__(self, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE, gitignore=True,
+                 workers=SCAN_WORKERS):
+        self.include = PatternSet(include or ('*',))
+        self.exclude = PatternSet(exclude or ())
+        self.gitignore = gitignore
+        self.workers = max(1, workers or SCAN_WORKERS)
+        self.errors = []
+        self.directories = 0
+
+    def _ignored(self, rel_path, is_dir, ignores):
+        if self.exclude.match(rel_path, is_dir):
+            return True
+        ignored = None
+        for rules in ignores:
+            matched = rules.match(rel_path, is_dir)
+            if matched is not None:
+                ignored = matched
+        return bool(ignored)
+
+    def _visit(self, directory, rel_dir, ignores, found, submit):
+        """List one directory, queueing matches and subdirectories"""
+        if self.gitignore:
+            rules = load_gitignore(directory, rel_dir)
+            if rules:
+                ignores = ignores + (rules,)
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            self.errors.append(f"{directory}: {e.strerror or e}")
+            return
+        self.directories += 1
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                # Symlinked folders are not followed, so the walk always ends
+                if entry.is_dir(follow_symlinks=False):
+                    if not self._ignored(rel_path, True, ignores):
+                        submit(entry.path, rel_path, ignores)
+                elif entry.is_file():
+                    if (self.include.match(rel_path)
+                            and not self._ignored(rel_path, False, ignores)):
+                        found.put(entry.path)
+            except OSError as e:
+                self.errors.append(f"{entry.path}: {e.strerror or e}")
+
+    def scan(self, paths):
+        """Yield files to convert for a mix of file and folder paths
+
+        Files are yielded as given, without filtering; folders are walked
+        recursively.  Each file is yielded once.  Unreadable folders are
+        skipped and listed in self.errors.  Closing the generator stops
+        the walk.
+        """
+        seen = set()
+        folders = []
+        for path in paths:
+            path = str(path)
+            if os.path.isdir(path):
+                folders.append(path)
+                continue
+            key = os.path.normcase(os.path.abspath(path))
+            if key not in seen:
+                seen.add(key)
+                yield path
+        if not folders:
+            return
+
+        # concurrent.futures is slow to import; runs without folders skip it
+        from concurrent.futures import ThreadPoolExecutor
+
+        found = queue.Queue()
+        stop = threading.Event()
+        lock = threading.Lock()
+        # Held at one until every folder is submitted, so the walk of the
+        # first folder cannot finish the scan before the others start
+        outstanding = [1]
+        executor = ThreadPoolExecutor(max_workers=self.workers,
+                                      thread_name_prefix='file-scanner')
+
+        def submit(directory, rel_dir, ignores):
+            if stop.is_set():
+                return
+            with lock:
+                outstanding[0] += 1
+            executor.submit(run, directory, rel_dir, ignores)
+
+        def release():
+            with lock:
+                outstanding[0] -= 1
+                finished = outstanding[0] == 0
+            if finished:
+                found.put(_DONE)
+
+        def run(directory, rel_dir, ignores):
+            try:
+                if not stop.is_set():
+                    self._visit(directory, rel_dir, ignores, found, submit)
+            except Exception as e:
+                self.errors.append(f"{directory}: {e}")
+            finally:
+                release()
+
+        try:
+            for folder in folders:
+                submit(folder, '', ())
+            release()
+            while True:
+                path = found.get()
+                if path is _DONE:
+                    break
+                key = os.path.normcase(os.path.abspath(path))
+                if key not in seen:
+                    seen.add(key)
+                    yield path
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def scan(paths, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE, gitignore=True,
+         workers=SCAN_WORKERS):
+    """Yield the files to convert for paths; see DirectoryScanner.scan()"""
+    return DirectoryScanner(include, exclude, gitignore, workers).scan(paths)
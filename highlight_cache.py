@@ -0,0 +1,255 @@
+"""Memoization cache for Pygments code highlighting.
+
+Highlighted code blocks are keyed on their language, a hash of the code,
+the Pygments style and every lexer/formatter option.  Lookups go through an
+in-memory LRU first and then a SQLite store shared by all runs and worker
+processes, so common snippets are highlighted once per machine rather than
+once per file.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_DIR_ENV = 'READMEHTML_CACHE_DIR'
+
+
+def default_cache_dir():
+    """Return the per-user cache directory for README HTML Generator"""
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'readmehtmlgenerator'
+
+
+def _forget_in_child(cache):
+    """Fork hook resetting cache in the child, without keeping it alive"""
+    ref = weakref.ref(cache)
+
+    def after_fork():
+        cache = ref()
+        if cache is not None:
+            cache._after_fork()
+    return after_fork
+
+
+class HighlightCache:
+    """Two-level (memory LRU + SQLite) cache of highlighted code blocks"""
+
+    def __init__(self, path=None, max_entries=4096, max_disk_entries=200000):
+        self.path = Path(path) if path else default_cache_dir() / 'highlight.sqlite3'
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._db = None
+        self._db_failed = False
+        self._installed = False
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_forget_in_child(self))
+
+    def _after_fork(self):
+        """Drop state inherited from the parent process
+
+        SQLite connections must not be used across fork, and the parent
+        flushes its own pending entries; the child opens its own connection
+        on first use.
+        """
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._db = None
+        self._db_failed = False
+        self._memory = OrderedDict()
+        self._pending = {}
+
+    def install(self):
+        """Route markdown's CodeHilite through this cache (idempotent)"""
+        if self._installed:
+            return
+        from markdown.extensions.codehilite import CodeHilite
+        import pygments
+
+        cache = self
+        original = CodeHilite.hilite
+        version = pygments.__version__
+
+        def hilite(self, shebang=True):
+            start = time.perf_counter()
+            key = cache.key(self, shebang, version)
+            html = cache.get(key)
+            if html is None:
+                html = original(self, shebang)
+                cache.put(key, html)
+            cache._local.seconds = (getattr(cache._local, 'seconds', 0.0)
+                                    + time.perf_counter() - start)
+            return html
+
+        CodeHilite.hilite = hilite
+        self._installed = True
+
+    @staticmethod
+    def key(block, shebang, pygments_version):
+        """Build the cache key for a CodeHilite block"""
+        parts = json.dumps([
+            block.lang,
+            hashlib.sha256(block.src.encode('utf-8')).hexdigest(),
+            block.options,
+            block.guess_lang,
+            block.use_pygments,
+            block.lang_prefix,
+            block.pygments_formatter,
+            shebang,
+            pygments_version,
+        ], sort_keys=True, default=repr)
+        return hashlib.sha256(parts.encode('utf-8')).hexdigest()
+
+    def _connect(self):
+        """Open the shared store lazily; failures fall back to memory only"""
+        import sqlite3
+
+        if self._db is None and not self._db_failed:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS highlights '
+                    '(key TEXT PRIMARY KEY, html TEXT NOT NULL, created REAL NOT NULL)'
+                )
+                # Keep the store bounded; the oldest entries go first
+                db.execute(
+                    'DELETE FROM highlights WHERE key IN (SELECT key FROM highlights '
+                    'ORDER BY created DESC LIMIT -1 OFFSET ?)',
+                    (self.max_disk_entries,)
+                )
+                db.commit()
+                self._db = db
+            except sqlite3.Error:
+                self._db_failed = True
+        return self._db
+
+    def _count(self, name):
+        counts = getattr(self._local, 'counts', None)
+        if counts is None:
+            counts = self._local.counts = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        counts[name] += 1
+        setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key):
+        import sqlite3
+
+        with self._lock:
+            html = self._memory.get(key)
+            if html is not None:
+                self._memory.move_to_end(key)
+                self._count('memory_hits')
+                return html
+
+            html = self._pending.get(key)
+            db = self._connect()
+            if html is None and db is not None:
+                try:
+                    row = db.execute(
+                        'SELECT html FROM highlights WHERE key = ?', (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                html = row[0] if row else None
+
+            if html is None:
+                self._count('misses')
+                return None
+            self._count('disk_hits')
+            self._remember(key, html)
+            return html
+
+    def put(self, key, html):
+        with self._lock:
+            self._remember(key, html)
+            self._pending[key] = html
+
+    def _remember(self, key, html):
+        self._memory[key] = html
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def flush(self):
+        """Write newly highlighted blocks to the shared store in one transaction"""
+        import sqlite3
+
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            db = self._connect()
+            if db is None:
+                return
+            now = time.time()
+            try:
+                with db:
+                    db.executemany(
+                        'INSERT OR REPLACE INTO highlights (key, html, created) VALUES (?, ?, ?)',
+                        [(key, html, now) for key, html in pending.items()]
+                    )
+            except sqlite3.Error:
+                pass
+
+    def take_counts(self):
+        """Return and reset the hit/miss counts of the calling thread"""
+        counts = getattr(self._local, 'counts', None) or {}
+        self._local.counts = None
+        return dict({'memory_hits': 0, 'disk_hits': 0, 'misses': 0}, **counts)
+
+    def take_seconds(self):
+        """Return and reset the time the calling thread spent highlighting"""
+        seconds = getattr(self._local, 'seconds', 0.0)
+        self._local.seconds = 0.0
+        return seconds
+
+    def reset(self, path=None):
+        """Drop every cached block and optionally move the shared store
+
+        Meant for benchmarks that need a cold cache; pending writes are lost.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+            self._db = None
+            self._db_failed = False
+            self._memory.clear()
+            self._pending.clear()
+            if path is not None:
+                self.path = Path(path)
+
+    def stats(self):
+        """Return process-wide counters and the overall hit rate"""
+        with self._lock:
+            return summarize_counts({
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+            })
+
+
+def summarize_counts(counts):
+    """Add a hit_rate entry to a dict of hit/miss counts"""
+    hits = counts['memory_hits'] + counts['disk_hits']
+    total = hits + counts['misses']
+    return dict(counts, hit_rate=hits / total if total else 0.0)
+
+
+HIGHLIGHT_CACHE = HighlightCache()
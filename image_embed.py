@@ -0,0 +1,139 @@
+"""Embed the local images of rendered pages.
+
+Local ``<img>`` sources are resolved relative to the README.  Images up to
+a size limit are inlined as data URIs; larger ones are copied into a shared
+``assets`` folder in the output directory under a content-hashed name, so
+pages keep working when moved together with that folder.  Every image is read
+and encoded once per process however many pages use it.
+
+Only image files inside the README's folder (or the site root) are
+embedded, so a page cannot pull other files from the machine into the
+published output; any other source is left as it is and counted as skipped.
+"""
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from html import unescape
+from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
+
+INLINE_IMAGE_LIMIT = 16 * 1024
+ASSETS_DIRNAME = 'assets'
+
+IMG_SRC_RE = re.compile(r'''(<img\b[^>]*?\bsrc=)(["'])(.*?)\2''', re.IGNORECASE | re.DOTALL)
+
+
+def _inside(path, root):
+    """Return True if the resolved path lies in root"""
+    try:
+        path.relative_to(root)
+    except ValueError:
+        return False
+    return True
+
+
+class ImageEmbedder:
+    """Rewrites local image sources, caching encoded images per process"""
+
+    def __init__(self):
+        self._images = {}
+        self._copied = set()
+        self._lock = threading.Lock()
+
+    def load(self, path, st, inline_limit=INLINE_IMAGE_LIMIT):
+        """Return {'digest', 'size', 'data_uri'} for an image file
+
+        Results are cached on the file's size and modification time, so a
+        logo shared by hundreds of pages is only read and encoded once.  The
+        data URI is only built for images of at most inline_limit bytes.
+        """
+        key = (str(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            image = self._images.get(key)
+        if image is None or (image['data_uri'] is None and image['size'] <= inline_limit):
+            data = path.read_bytes()
+            image = {'digest': hashlib.sha256(data).hexdigest(), 'size': len(data),
+                     'data_uri': None}
+            if image['size'] <= inline_limit:
+                mime = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+                encoded = base64.b64encode(data).decode('ascii')
+                image['data_uri'] = f"data:{mime};base64,{encoded}"
+            with self._lock:
+                self._images[key] = image
+        return image
+
+    def copy(self, path, digest, output_dir):
+        """Copy an image into the shared assets folder; returns its URL"""
+        name = f"{path.stem}.{digest[:12]}{path.suffix.lower()}"
+        directory = Path(output_dir) / ASSETS_DIRNAME
+        key = (str(directory.resolve()), name)
+        with self._lock:
+            copied = key in self._copied
+        if not copied:
+            target = directory / name
+            if not target.exists():
+                directory.mkdir(parents=True, exist_ok=True)
+                # Write then rename, so parallel workers and threads never see a partial file
+                tmp_path = target.with_name(f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(path.read_bytes())
+                os.replace(tmp_path, target)
+            with self._lock:
+                self._copied.add(key)
+        return f"{ASSETS_DIRNAME}/{quote(name)}"
+
+    def embed(self, html, source_dir, output_dir, inline_limit=INLINE_IMAGE_LIMIT,
+              stats=None, root=None, url_prefix=''):
+        """Return html with local images inlined or copied next to the page
+
+        Remote, absolute and missing images are left untouched, and so are
+        files that are not images or lie outside root (default: source_dir).
+        Copied images go to the assets folder in output_dir; url_prefix is
+        the page's relative URL of output_dir.  Files the page depends on are
+        listed in stats['dependencies'] so incremental builds notice when an
+        image changes.
+        """
+        source_dir = Path(source_dir)
+        root = Path(root or source_dir).resolve()
+        counts = {'inlined': 0, 'copied': 0, 'missing': 0, 'skipped': 0}
+        dependencies = {}
+
+        def replace(match):
+            prefix, quote_char, src = match.groups()
+            url = urlsplit(unescape(src))
+            if url.scheme or url.netloc or not url.path or url.path.startswith('/'):
+                return match.group(0)
+            path = (source_dir / unquote(url.path)).resolve()
+            mime = mimetypes.guess_type(path.name)[0] or ''
+            if not mime.startswith('image/') or not _inside(path, root):
+                counts['skipped'] += 1
+                return match.group(0)
+            try:
+                st = os.stat(path)
+                image = self.load(path, st, inline_limit)
+            except OSError:
+                counts['missing'] += 1
+                return match.group(0)
+            dependencies[str(path)] = [st.st_size, st.st_mtime_ns]
+
+            if image['size'] <= inline_limit:
+                counts['inlined'] += 1
+                new_src = image['data_uri']
+            else:
+                counts['copied'] += 1
+                new_src = url_prefix + self.copy(path, image['digest'], output_dir)
+            return f"{prefix}{quote_char}{new_src}{quote_char}"
+
+        html = IMG_SRC_RE.sub(replace, html)
+        if stats is not None:
+            images = stats.setdefault('images', {'inlined': 0, 'copied': 0, 'missing': 0,
+                                                 'skipped': 0})
+            for name, value in counts.items():
+                images[name] += value
+            stats.setdefault('dependencies', {}).update(dependencies)
+        return html
+
+
+IMAGE_EMBEDDER = ImageEmbedder()
@@ -0,0 +1,252 @@
+"""Split large Markdown documents into independently convertible sections.
+
+Huge documents are cut at top-level ATX headings that sit outside fenced
+code and raw HTML blocks.  Each section is converted on its own and the
+results are stitched back together so that the output matches a serial
+conversion of the whole document:
+
+* reference-style link definitions are collected up front and made
+  available to every section;
+* headings get placeholder ids while a section is converted, and
+  HeadingResolver later replays the toc extension's de-duplication over the
+  whole document to assign the real ids;
+* TOC tokens are flattened per section and nested once at the end.
+"""
+import re
+import threading
+
+SECTION_CHARS = 1 << 20
+
+# Python-Markdown strips STX and ETX from its input, so no document can
+# contain a placeholder of its own
+HEADING_PLACEHOLDER = '\x02rhgheading:{}\x03'
+
+# Appended to every section so the block separator at its end survives the
+# final strip() Markdown applies to its output
+SECTION_END = 'rhgsectionend'
+SECTION_END_HTML = '<p>rhgsectionend</p>'
+PLACEHOLDER_RE = re.compile(r'\x02rhgheading:(\d+)\x03')
+# A placeholder as a heading id or a link to one in the inline TOC
+PLACEHOLDER_ATTRIBUTE_RE = re.compile(r'( id="| href="#)\x02rhgheading:(\d+)\x03(?=")')
+
+# Opening line of a fenced block, as accepted by the fenced_code extension
+FENCE_RE = re.compile(r'''
+    ^(?P<fence>~{3,}|`{3,})[ ]*
+    ((\{[^\}\n]*\})|
+    (\.?[\w#.+-]*[ ]*)?
+    (hl_lines=(?P<quot>"|').*?(?P=quot)[ ]*)?)$
+''', re.VERBOSE)
+HEADING_RE = re.compile(r'^#{1,6}')
+REFERENCE_RE = re.compile(r'^ {0,3}\[[^\[\]]*\]:')
+HTML_OPEN_RE = re.compile(r'^<(!--|[a-zA-Z][a-zA-Z0-9-]*)')
+
+# Tags Python-Markdown treats as raw HTML blocks (markdown.util.BLOCK_LEVEL_ELEMENTS)
+BLOCK_LEVEL_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'details', 'div', 'dl',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'header', 'hgroup', 'main', 'menu', 'nav', 'ol', 'p',
+    'pre', 'section', 'table', 'ul', 'canvas', 'colgroup', 'dd', 'body', 'dt',
+    'group', 'html', 'iframe', 'li', 'legend', 'math', 'map', 'noscript',
+    'output', 'object', 'option', 'progress', 'script', 'style', 'summary',
+    'tbody', 'td', 'textarea', 'tfoot', 'th', 'thead', 'tr', 'video',
+])
+
+_recorder = threading.local()
+
+
+class BlockScanner:
+    """Tracks fenced code and raw HTML blocks while reading line by line"""
+
+    def __init__(self):
+        self.fence = None
+        self.html_tag = None
+        self.html_depth = 0
+        self.previous_blank = True
+
+    @property
+    def in_block(self):
+        return self.fence is not None or self.html_tag is not None
+
+    def feed(self, line):
+        """Consume a line; return True if it is top-level Markdown"""
+        stripped = line.rstrip('\r\n')
+        top_level = not self.in_block
+
+        if self.fence is not None:
+            if stripped.rstrip(' ') == self.fence:
+                self.fence = None
+        elif self.html_tag is not None:
+            self._track_html(stripped)
+        else:
+            fence = FENCE_RE.match(stripped)
+            html_open = HTML_OPEN_RE.match(stripped) if self.previous_blank else None
+            if fence:
+                self.fence = fence.group('fence')
+            elif html_open and (html_open.group(1) == '!--'
+                                or html_open.group(1).lower() in BLOCK_LEVEL_TAGS):
+                self.html_tag = html_open.group(1).lower()
+                self.html_depth = 0
+                self._track_html(stripped)
+
+        self.previous_blank = not stripped.strip()
+        return top_level
+
+    def _track_html(self, line):
+        if self.html_tag == '!--':
+            if '-->' in line:
+                self.html_tag = None
+            return
+        lowered = line.lower()
+        tag = self.html_tag
+        self.html_depth += len(re.findall(r'<{}[\s>/]'.format(re.escape(tag)), lowered + ' '))
+        self.html_depth -= lowered.count('</{}'.format(tag))
+        if self.html_depth <= 0:
+            self.html_tag = None
+
+    def is_boundary(self, line):
+        """Feed a line and report whether a section may start with it"""
+        after_blank = self.previous_blank
+        top_level = self.feed(line)
+        return top_level and after_blank and bool(HEADING_RE.match(line)) and not self.in_block
+
+
+def iter_sections(lines, min_chars=SECTION_CHARS):
+    """Group lines into sections of at least min_chars characters
+
+    Sections only ever start at a top-level heading preceded by a blank
+    line, so a document without such headings comes back as one section.
+    """
+    scanner = BlockScanner()
+    section = []
+    size = 0
+    for line in lines:
+        if scanner.is_boundary(line) and size >= min_chars:
+            yield ''.join(section)
+            section = []
+            size = 0
+        section.append(line)
+        size += len(line)
+    if section:
+        yield ''.join(section)
+
+
+def collect_reference_lines(lines):
+    """Return the text of every candidate reference definition"""
+    scanner = BlockScanner()
+    candidates = []
+    keep_next = False
+    for line in lines:
+        top_level = scanner.feed(line)
+        if keep_next:
+            keep_next = False
+            if line.strip()[:1] in ('"', "'", '(') or candidates[-1].rstrip().endswith(':'):
+                candidates[-1] += line
+                continue
+        if top_level and REFERENCE_RE.match(line):
+            candidates.append(line if line.endswith('\n') else line + '\n')
+            keep_next = True
+    return '\n'.join(candidates)
+
+
+def collect_references(lines, md):
+    """Parse the reference definitions of a whole document with md"""
+    text = collect_reference_lines(lines)
+    if not text:
+        return {}
+    md.convert(text)
+    return dict(md.references)
+
+
+def recording_slugify(value, separator):
+    """toc slugify hook: record the real slug, return a placeholder id"""
+    from markdown.extensions.toc import slugify
+
+    slugs = _recorder.slugs
+    slugs.append(slugify(value, separator))
+    return HEADING_PLACEHOLDER.format(len(slugs) - 1)
+
+
+SECTION_EXTENSION_CONFIGS = {'toc': {'slugify': recording_slugify}}
+
+
+class PinnedReferences(dict):
+    """Reference table whose document-wide definitions cannot be overridden
+
+    Python-Markdown lets the last definition of a reference win.  The
+    document-wide table already holds those winners, so a section must not
+    replace them with an earlier definition it happens to contain.
+    """
+
+    def __init__(self, pinned):
+        super().__init__(pinned)
+        self.pinned = frozenset(pinned)
+
+    def __setitem__(self, key, value):
+        if key not in self.pinned:
+            super().__setitem__(key, value)
+
+
+def convert_section(md, text, references):
+    """Convert one section with an md built from SECTION_EXTENSION_CONFIGS
+
+    Returns the HTML with placeholder heading ids, the recorded slugs and
+    the section's flat TOC tokens; pass them to HeadingResolver.resolve().
+    Section bodies keep their trailing separator, so concatenating them and
+    stripping the result reproduces a serial conversion.
+    """
+    _recorder.slugs = []
+    md.references = PinnedReferences(references)
+    try:
+        body = md.convert('{}\n\n{}\n'.format(text, SECTION_END))
+    finally:
+        md.references = {}
+    if body.endswith(SECTION_END_HTML):
+        body = body[:-len(SECTION_END_HTML)]
+    else:
+        # The marker was swallowed, e.g. by an unclosed raw HTML block
+        body += '\n'
+    return body, _recorder.slugs, flatten_toc_tokens(md.toc_tokens)
+
+
+def flatten_toc_tokens(tokens):
+    """Turn nested TOC tokens back into a flat list in document order"""
+    flat = []
+    for token in tokens:
+        flat.append({key: value for key, value in token.items() if key != 'children'})
+        flat.extend(flatten_toc_tokens(token.get('children', [])))
+    return flat
+
+
+def _escape_attribute(value):
+    return (value.replace('&', '&amp;').replace('<', '&lt;')
+            .replace('>', '&gt;').replace('"', '&quot;'))
+
+
+class HeadingResolver:
+    """Assigns serial heading ids to sections converted in isolation"""
+
+    def __init__(self):
+        self.used_ids = set()
+        self.tokens = []
+
+    def resolve(self, body, slugs, tokens):
+        """Replace a section's placeholder ids; sections must come in order"""
+        from markdown.extensions.toc import unique
+
+        final_ids = [unique(slug, self.used_ids) for slug in slugs]
+
+        def final_id(match):
+            return final_ids[int(match.group(1))]
+
+        def final_attribute(match):
+            return match.group(1) + _escape_attribute(final_ids[int(match.group(2))])
+
+        for token in tokens:
+            self.tokens.append(dict(token, id=PLACEHOLDER_RE.sub(final_id, token['id'])))
+        return PLACEHOLDER_ATTRIBUTE_RE.sub(final_attribute, body)
+
+    def toc_tokens(self):
+        """Nest the TOC tokens of every resolved section"""
+        from markdown.extensions.toc import nest_toc_tokens
+
+        return nest_toc_tokens([dict(token) for token in self.tokens])
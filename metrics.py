@@ -0,0 +1,211 @@
+"""Run metrics and profiling for batch conversions.
+
+RunMetrics gathers the per-file, per-stage spans the engine records in each
+ConversionResult's stats, plus spans for work outside the engine such as GUI
+progress callbacks.  At the end of a run it reports throughput, per-file
+latency percentiles and cache hit rates, as JSON or in the Prometheus
+text-file format (for node_exporter's textfile collector).
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from highlight_cache import summarize_counts
+
+METRIC_PREFIX = 'readme_html'
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of values (q between 0 and 100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _write_atomic(path, text):
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def profiled(path):
+    """Capture a cProfile of the block into path, if path is set
+
+    Only the calling process is profiled; convert with one job to include
+    the conversion work itself.
+    """
+    if not path:
+        yield None
+        return
+    import cProfile
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        profile.dump_stats(str(path))
+
+
+class RunMetrics:
+    """Collects the results and spans of one conversion run"""
+
+    def __init__(self):
+        self.files = []
+        self.spans = []
+        self.manifest = None
+        self.pipeline = None
+        self._started = time.time()
+        self._start = time.perf_counter()
+        self._elapsed = None
+        self._lock = threading.Lock()
+
+    def add_result(self, result):
+        """Record a ConversionResult and the spans the engine measured"""
+        stats = result.stats
+        record = {
+            'source': str(result.source),
+            'bytes': stats.get('bytes', 0),
+            'seconds': stats.get('seconds', 0.0),
+            'skipped': result.skipped,
+            'error': result.error,
+            'timings': dict(stats.get('timings', {})),
+            'highlight': dict(stats.get('highlight', {})),
+        }
+        with self._lock:
+            self.files.append(record)
+            for span in stats.get('spans', []):
+                self.spans.append(dict(span, source=record['source']))
+
+    def add_span(self, stage, start, seconds, source=None):
+        """Record work done outside the engine; start is a time.time() value"""
+        with self._lock:
+            self.spans.append({'stage': stage, 'start': start, 'seconds': seconds,
+                               'source': source})
+
+    @contextmanager
+    def span(self, stage, source=None):
+        start = time.time()
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(stage, start, time.perf_counter() - began, source)
+
+    def finish(self):
+        """Stop the run clock; later calls keep the first end time"""
+        if self._elapsed is None:
+            self._elapsed = time.perf_counter() - self._start
+        return self._elapsed
+
+    def summary(self):
+        """Throughput, latency percentiles, stage totals and cache hit rates"""
+        elapsed = self._elapsed if self._elapsed is not None else time.perf_counter() - self._start
+        with self._lock:
+            files = list(self.files)
+            spans = list(self.spans)
+        converted = [f for f in files if not f['skipped'] and not f['error']]
+        latencies = [f['seconds'] for f in converted]
+        converted_bytes = sum(f['bytes'] for f in converted)
+
+        stages = {}
+        for span in spans:
+            stages[span['stage']] = stages.get(span['stage'], 0.0) + span['seconds']
+        highlight = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        for f in files:
+            for name, value in f['highlight'].items():
+                highlight[name] += value
+
+        caches = {'highlight': summarize_counts(highlight)}
+        if self.manifest is not None:
+            total = self.manifest['hits'] + self.manifest['misses']
+            caches['manifest'] = dict(self.manifest,
+                                      hit_rate=self.manifest['hits'] / total if total else 0.0)
+        return {
+            'started': self._started,
+            'seconds': elapsed,
+            'files': len(files),
+            'converted': len(converted),
+            'skipped': sum(1 for f in files if f['skipped']),
+            'failed': sum(1 for f in files if f['error']),
+            'bytes': converted_bytes,
+            'files_per_second': len(converted) / elapsed if elapsed else 0.0,
+            'bytes_per_second': converted_bytes / elapsed if elapsed else 0.0,
+            'latency': {
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'max': max(latencies, default=0.0),
+            },
+            'stages': stages,
+            'caches': caches,
+            'pipeline': dict(self.pipeline or {}),
+        }
+
+    def write_json(self, path):
+        """Write the summary together with every file record and span"""
+        with self._lock:
+            data = {'summary': None, 'files': list(self.files), 'spans': list(self.spans)}
+        data['summary'] = self.summary()
+        _write_atomic(path, json.dumps(data, indent=2, sort_keys=True))
+
+    def prometheus(self):
+        """Return the summary in the Prometheus text exposition format"""
+        summary = self.summary()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text
+                             else f"{name} {value}")
+
+        metric('run_seconds', 'gauge', 'Wall time of the last conversion run.',
+               [({}, summary['seconds'])])
+        metric('files', 'gauge', 'Files in the last run by outcome.',
+               [({'outcome': outcome}, summary[outcome])
+                for outcome in ('converted', 'skipped', 'failed')])
+        metric('converted_bytes', 'gauge', 'Source bytes converted in the last run.',
+               [({}, summary['bytes'])])
+        metric('files_per_second', 'gauge', 'Converted files per second.',
+               [({}, summary['files_per_second'])])
+        metric('bytes_per_second', 'gauge', 'Converted source bytes per second.',
+               [({}, summary['bytes_per_second'])])
+        metric('file_latency_seconds', 'gauge', 'Per-file conversion latency percentiles.',
+               [({'quantile': q}, summary['latency'][key])
+                for q, key in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99'), ('1', 'max'))])
+        metric('stage_seconds', 'gauge', 'Time spent per conversion stage.',
+               [({'stage': stage}, seconds)
+                for stage, seconds in sorted(summary['stages'].items())])
+        metric('cache_hit_ratio', 'gauge', 'Cache hit rate by cache.',
+               [({'cache': name}, counts['hit_rate'])
+                for name, counts in sorted(summary['caches'].items())])
+        if summary['pipeline']:
+            stages = sorted(summary['pipeline'].items())
+            metric('pipeline_busy_seconds', 'gauge', 'Time each pipeline stage spent working.',
+                   [({'stage': stage}, values['busy_seconds']) for stage, values in stages])
+            metric('pipeline_queue_depth', 'gauge', 'Input queue depth of each pipeline stage.',
+                   [({'stage': stage, 'stat': stat}, values[f'queue_{stat}'])
+                    for stage, values in stages for stat in ('max', 'mean')])
+            isolation = summary['pipeline'].get('convert', {})
+            if 'retried' in isolation:
+                metric('isolated_worker_events', 'gauge',
+                       'Files that timed out, crashed their worker or were retried.',
+                       [({'event': event}, isolation[event])
+                        for event in ('timeouts', 'crashes', 'retried')])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        _write_atomic(path, self.prometheus())
@@ -0,0 +1,183 @@
+"""Whitespace, CSS and JavaScript minification of rendered pages.
+
+The theme stylesheet and script are minified once per theme load (see
+ThemeSnapshot.minified() in readme_engine) and the page is minified after
+templating.  Every minifier here is conservative: it only drops comments
+and whitespace that cannot change how a page renders or behaves.
+
+* HTML: whitespace runs in text collapse to one space, and whitespace next
+  to block-level tags is dropped.  ``<pre>``, ``<textarea>``, ``<script>``,
+  ``<style>`` and comments are copied exactly, and tags are never touched.
+* CSS: comments go, whitespace collapses, and spaces around ``{};,>`` and
+  after ``:`` are removed; strings are kept.
+* JavaScript: comments go and whitespace shrinks to what separates tokens.
+  Line breaks are kept wherever automatic semicolon insertion may rely on
+  them; strings, template literals and regular expressions are kept.
+
+Only ASCII whitespace is collapsed, so non-breaking spaces survive.
+"""
+import re
+
+# Tags whose surrounding whitespace never renders
+BLOCK_TAGS = frozenset("""
+    !doctype address article aside blockquote body br dd details div dl dt
+    fieldset figcaption figure footer form h1 h2 h3 h4 h5 h6 head header hr
+    html li link main meta nav ol p pre section summary table tbody td tfoot
+    th thead title tr ul
+""".split())
+
+HTML_TOKEN_RE = re.compile(
+    r'<!--.*?-->|<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>|<[^>]*>',
+    re.IGNORECASE | re.DOTALL
+)
+TAG_NAME_RE = re.compile(r'</?([!a-zA-Z][a-zA-Z0-9-]*)')
+SPACE_RE = re.compile(r'[ \t\n\r\f]+')
+
+CSS_TOKEN_RE = re.compile(r'''"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/''', re.DOTALL)
+CSS_PUNCTUATION_RE = re.compile(r' ?([{};,>]) ?')
+CSS_COLON_RE = re.compile(r': ')
+
+# Characters after which a "/" starts a regular expression, not a division
+_REGEX_PRECEDERS = frozenset('(,=:[!&|?{};+-*%<>~^')
+# A line break after these can never end a statement
+_NO_ASI_AFTER = frozenset('{;,([')
+# ...nor one before these
+_NO_ASI_BEFORE = frozenset(')]};,.')
+
+
+def _is_word(char):
+    return char.isalnum() or char in '_$\\' or ord(char) > 127
+
+
+def _is_block(tag):
+    match = TAG_NAME_RE.match(tag)
+    return match is not None and match.group(1).lower() in BLOCK_TAGS
+
+
+def minify_html(html):
+    """Collapse insignificant whitespace outside preformatted elements"""
+    tokens = []
+    position = 0
+    for match in HTML_TOKEN_RE.finditer(html):
+        if match.start() > position:
+            tokens.append((None, html[position:match.start()]))
+        tag = match.group(0)
+        tokens.append((_is_block(tag), tag))
+        position = match.end()
+    if position < len(html):
+        tokens.append((None, html[position:]))
+
+    out = []
+    for index, (block, text) in enumerate(tokens):
+        if block is None:
+            # The start and end of the document count as block boundaries
+            text = SPACE_RE.sub(' ', text)
+            if index == 0 or tokens[index - 1][0]:
+                text = text.lstrip(' ')
+            if index == len(tokens) - 1 or tokens[index + 1][0]:
+                text = text.rstrip(' ')
+        out.append(text)
+    return ''.join(out)
+
+
+def _minify_css_code(code):
+    code = SPACE_RE.sub(' ', code)
+    code = CSS_PUNCTUATION_RE.sub(r'\1', code)
+    return CSS_COLON_RE.sub(':', code).replace(';}', '}')
+
+
+def minify_css(css):
+    """Drop comments and whitespace from a stylesheet, keeping strings"""
+    out = []
+    code = []
+    position = 0
+    for match in CSS_TOKEN_RE.finditer(css):
+        code.append(css[position:match.start()])
+        if match.group(0).startswith('/*'):
+            # Code on both sides of a comment is minified as one piece
+            code.append(' ')
+        else:
+            out.append(_minify_css_code(''.join(code)))
+            out.append(match.group(0))
+            code = []
+        position = match.end()
+    code.append(css[position:])
+    out.append(_minify_css_code(''.join(code)))
+    return ''.join(out).strip()
+
+
+def _skip_quoted(js, start, quote):
+    """Index just past the string or template literal starting at start"""
+    i = start + 1
+    while i < len(js):
+        if js[i] == '\\':
+            i += 2
+            continue
+        if js[i] == quote:
+            return i + 1
+        i += 1
+    return len(js)
+
+
+def _skip_regex(js, start):
+    """Index just past the regular expression literal starting at start"""
+    i = start + 1
+    in_class = False
+    while i < len(js) and js[i] != '\n':
+        char = js[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < len(js) and _is_word(js[i]):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def minify_js(js):
+    """Drop comments and whitespace from a script without changing its tokens"""
+    out = []
+    last = ''
+    pending = ''
+    i = 0
+    length = len(js)
+    while i < length:
+        char = js[i]
+        if char in ' \t\n\r\f':
+            pending += '\n' if char in '\n\r' else ' '
+            i += 1
+            continue
+        if char == '/' and js.startswith('//', i):
+            end = js.find('\n', i)
+            i = length if end == -1 else end
+            continue
+        if char == '/' and js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            pending += ' '
+            continue
+
+        if char in '"\'`':
+            end = _skip_quoted(js, i, char)
+        elif char == '/' and (not last or last in _REGEX_PRECEDERS):
+            end = _skip_regex(js, i)
+        else:
+            end = i + 1
+        if pending and last:
+            if '\n' in pending and last not in _NO_ASI_AFTER and char not in _NO_ASI_BEFORE:
+                out.append('\n')
+            elif (_is_word(last) and _is_word(char)) or (last == char and char in '+-'):
+                out.append(' ')
+        pending = ''
+        token = js[i:end]
+        out.append(token)
+        last = token[-1]
+        i = end
+    return ''.join(out)
@@ -0,0 +1,147 @@
+"""PDF export of rendered pages through WeasyPrint.
+
+WeasyPrint is slow to import and to set up fonts, so PDFs are rendered in a
+pool of long-lived worker processes.  Each worker imports WeasyPrint and
+builds its font configuration once, parses the theme stylesheet once per
+theme and shares an image cache between documents.  PDFs are rendered from
+the HTML files convert_readme_to_html() writes; the theme stylesheet in them
+is swapped for the worker's parsed copy, which yields the same result.
+"""
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import readme_engine
+
+_worker = {}
+
+
+@dataclass
+class PdfResult:
+    """Outcome of rendering one HTML page to PDF"""
+    source: str
+    output: str = None
+    error: str = None
+    seconds: float = 0.0
+
+
+def weasyprint_available():
+    """Return True if WeasyPrint and its native libraries can be loaded"""
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def pdf_path_for(html_path):
+    return Path(html_path).with_suffix('.pdf')
+
+
+def pdf_outdated(html_path):
+    """Return True if the PDF of html_path is missing or older than it"""
+    try:
+        return os.stat(pdf_path_for(html_path)).st_mtime_ns < os.stat(html_path).st_mtime_ns
+    except OSError:
+        return True
+
+
+def _init_worker():
+    """Pay WeasyPrint's start-up cost once per worker process"""
+    from weasyprint import HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    _worker['font_config'] = FontConfiguration()
+    _worker['stylesheets'] = {}
+    _worker['image_cache'] = {}
+    # Lay out an empty page so the first real document starts warm
+    HTML(string='<p></p>').render(font_config=_worker['font_config'])
+
+
+def _stylesheet(css):
+    """Parse the theme CSS once per worker and theme"""
+    from weasyprint import CSS
+
+    key = hashlib.sha256(css.encode('utf-8')).hexdigest()
+    stylesheets = _worker['stylesheets']
+    if key not in stylesheets:
+        stylesheets[key] = CSS(string=css, font_config=_worker['font_config'])
+    return stylesheets[key]
+
+
+def _render_pdf(args):
+    """Process pool entry point returning a PdfResult"""
+    from weasyprint import HTML, default_url_fetcher
+
+    html_path, pdf_path, theme = args
+    result = PdfResult(str(html_path))
+    start = time.perf_counter()
+    tmp_path = Path(f"{pdf_path}.{os.getpid()}.tmp")
+    try:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            page = f.read()
+        # The theme stylesheet is inlined or linked by its hashed name;
+        # either way the pre-parsed copy is applied instead
+        page = page.replace(theme['inline_stylesheet'], '', 1)
+
+        def url_fetcher(url):
+            if url.rsplit('/', 1)[-1] == theme['css_name']:
+                return {'string': '', 'mime_type': 'text/css'}
+            return default_url_fetcher(url)
+
+        HTML(string=page, base_url=str(Path(html_path).resolve().parent),
+             url_fetcher=url_fetcher).write_pdf(
+            tmp_path,
+            stylesheets=[_stylesheet(theme['css'])],
+            font_config=_worker['font_config'],
+            cache=_worker['image_cache'],
+        )
+        os.replace(tmp_path, pdf_path)
+        result.output = str(pdf_path)
+    except Exception as e:
+        result.error = str(e)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+class PdfRenderer:
+    """Pool of warm WeasyPrint workers; submit() returns futures of PdfResult"""
+
+    def __init__(self, jobs=1):
+        self.jobs = readme_engine.resolve_jobs(jobs)
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker)
+        # Workers start on demand; spawn them now so they warm up while
+        # the HTML is still being converted
+        for _ in range(self.jobs):
+            self.executor.submit(time.sleep, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, html_path, pdf_path=None, options=None):
+        """Queue an HTML page for PDF rendering
+
+        options are the export options the page was rendered with; they
+        tell which theme stylesheet (minified or not) the page carries.
+        """
+        theme = readme_engine.THEME_ASSETS.snapshot()
+        if options and options.get('minify'):
+            theme = theme.minified()
+        args = (str(html_path), str(pdf_path or pdf_path_for(html_path)), {
+            'css': theme.css,
+            'css_name': theme.asset_names['css'],
+            'inline_stylesheet': theme.inline_stylesheet,
+        })
+        return self.executor.submit(_render_pdf, args)
+
+    def close(self, cancel=False):
+        self.executor.shutdown(wait=not cancel, cancel_futures=cancel)
@@ -0,0 +1,305 @@
+"""Staged conversion pipeline that overlaps reading, converting and writing.
+
+A batch runs as three stages joined by bounded asyncio queues:
+
+* read: several tasks take the next file, check its size and read it in a
+  thread, so slow (network) disks are read in parallel;
+* convert: one task per job renders pages in an executor: an IsolatedPool
+  (see worker_pool) when a per-file time or memory limit is set, otherwise
+  a process pool for several jobs or a single thread;
+* write: several tasks write finished pages, and compress them when
+  pre-compressed siblings are enabled, in threads.
+
+While one file is parsed, the next ones are being read and earlier pages
+written.  The queues bound how many sources and pages are held in memory;
+a full queue makes the stage before it wait.  Each stage records its busy
+time and the depth of its input queue.
+
+A file that overruns its limits only costs the worker it ran in: that
+worker is killed and replaced, the file retried once and then reported
+as failed, while the other workers go on with the batch.
+
+asyncio is slow to import, so readme_engine only loads this module for
+batches of more than one file.
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import readme_engine
+import site_map
+from readme_engine import ConversionResult
+from worker_pool import IsolatedPool
+
+# Threads reading and writing files; I/O bound, so independent of the CPUs
+IO_THREADS = 4
+
+_DONE = object()
+
+
+class StageStats:
+    """Busy time, item count and input queue depth of one pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.queue_max = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+
+    def sample(self, depth):
+        """Record the input queue depth seen when an item arrives"""
+        self.queue_max = max(self.queue_max, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+    def add(self, seconds):
+        self.items += 1
+        self.busy += seconds
+
+    def summary(self):
+        return {
+            'items': self.items,
+            'busy_seconds': self.busy,
+            'queue_max': self.queue_max,
+            'queue_mean': (self._depth_total / self._depth_samples
+                           if self._depth_samples else 0.0),
+        }
+
+
+def _render_job(args):
+    """Executor entry point: render one source read by the read stage"""
+    readme_path, content, output_dir, options, stats, split_jobs = args
+    start = time.perf_counter()
+    try:
+        output_path, page = readme_engine.render_readme(
+            readme_path, content, output_dir, options, stats, split_jobs
+        )
+        output_path, error = str(output_path), None
+    except Exception as e:
+        output_path, page, error = None, None, str(e) or type(e).__name__
+    stats['peak_rss'] = readme_engine.peak_rss_bytes()
+    return output_path, page, error, stats, time.perf_counter() - start
+
+
+class ConversionPipeline:
+    """Converts a batch through read, convert and write stages
+
+    queue_depth bounds each queue between stages (default: twice jobs).
+    Files of at least stream_threshold bytes are not read up front; the
+    convert stage hands them to the bounded-memory streaming path.  A
+    SiteMap is installed in every worker process once, at start-up.
+
+    file_timeout (seconds) and memory_limit (bytes per worker) run the
+    conversions in isolated workers; a file that exceeds them is retried
+    once in a fresh worker and then fails with an error result.
+    """
+
+    def __init__(self, output_dir=None, options=None, jobs=1, queue_depth=None,
+                 stream_threshold=readme_engine.STREAM_THRESHOLD, split_jobs=1,
+                 cancelled=None, io_threads=IO_THREADS, site=None, file_timeout=None,
+                 memory_limit=None):
+        self.output_dir = output_dir
+        self.options = options
+        self.jobs = readme_engine.resolve_jobs(jobs)
+        self.queue_depth = max(queue_depth or self.jobs * 2, 1)
+        self.stream_threshold = stream_threshold
+        self.split_jobs = split_jobs
+        self.cancelled = cancelled or (lambda: False)
+        self.io_threads = max(1, io_threads)
+        self.site = site
+        self.file_timeout = file_timeout or None
+        self.memory_limit = memory_limit or None
+        self.isolation = None
+        self.stages = {name: StageStats(name) for name in ('read', 'convert', 'write')}
+
+    def summary(self):
+        """Per-stage items, busy seconds and input queue depths
+
+        With isolated workers the convert stage also counts the files that
+        timed out, crashed their worker or were retried.
+        """
+        summary = {name: stage.summary() for name, stage in self.stages.items()}
+        if self.isolation is not None:
+            summary['convert'].update(self.isolation)
+        return summary
+
+    def run(self, items):
+        """Yield a ConversionResult per item, in completion order
+
+        items yields file paths to convert, or ready ConversionResults
+        (such as files skipped as up to date), which are passed through.
+        The stages run on an event loop in a background thread.  Closing
+        the generator or cancelling stops reading and converting new
+        files; pages already converted are still written.
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=asyncio.run, args=(self._run(iter(items), results, stop),),
+            name='conversion-pipeline', daemon=True
+        )
+        thread.start()
+        try:
+            while True:
+                result = results.get()
+                if result is _DONE:
+                    break
+                if isinstance(result, BaseException):
+                    raise result
+                yield result
+        finally:
+            stop.set()
+            thread.join()
+
+    async def _run(self, items, results, stop):
+        loop = asyncio.get_running_loop()
+        to_convert = asyncio.Queue(self.queue_depth)
+        to_write = asyncio.Queue(self.queue_depth)
+        io = ThreadPoolExecutor(self.io_threads, thread_name_prefix='pipeline-io')
+        if self.file_timeout or self.memory_limit:
+            # Under a memory limit the renderer is loaded before the limit is set
+            initializer = readme_engine.warm_worker if self.memory_limit else site_map.activate
+            cpu = IsolatedPool(self.jobs, self.file_timeout, self.memory_limit,
+                               initializer=initializer, initargs=(self.site,))
+        elif self.jobs > 1:
+            cpu = ProcessPoolExecutor(max_workers=self.jobs, initializer=site_map.activate,
+                                      initargs=(self.site,))
+        else:
+            cpu = ThreadPoolExecutor(1, thread_name_prefix='pipeline-convert')
+        next_lock = asyncio.Lock()
+        tasks = []
+        try:
+            readers = [asyncio.create_task(self._read(loop, io, items, next_lock, to_convert,
+                                                      results, stop))
+                       for _ in range(self.io_threads)]
+            converters = [asyncio.create_task(self._convert(loop, cpu, to_convert, to_write,
+                                                            results, stop))
+                          for _ in range(self.jobs)]
+            writers = [asyncio.create_task(self._write(loop, io, to_write, results))
+                       for _ in range(self.io_threads)]
+
+            async def drain():
+                await asyncio.gather(*readers)
+                for _ in converters:
+                    await to_convert.put(None)
+                await asyncio.gather(*converters)
+                for _ in writers:
+                    await to_write.put(None)
+                await asyncio.gather(*writers)
+
+            tasks = readers + converters + writers + [asyncio.create_task(drain())]
+            # A stage that dies would leave the others waiting on its queue
+            # forever, so all of them are watched and stopped together
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        except BaseException as e:
+            results.put(e)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            io.shutdown(wait=False, cancel_futures=True)
+            cpu.shutdown(wait=True, cancel_futures=True)
+            if isinstance(cpu, IsolatedPool):
+                self.isolation = cpu.stats()
+            results.put(_DONE)
+
+    async def _read(self, loop, io, items, next_lock, to_convert, results, stop):
+        stage = self.stages['read']
+        while not stop.is_set() and not self.cancelled():
+            # Items may come from a folder scan; never block the loop on it
+            async with next_lock:
+                item = await loop.run_in_executor(io, next, items, _DONE)
+            if item is _DONE:
+                return
+            if not isinstance(item, (str, os.PathLike)):
+                # A ready result; checked by type, since readme_engine may also
+                # be running as __main__ with its own ConversionResult class
+                results.put(item)
+                continue
+            job = await loop.run_in_executor(io, self._read_one, item)
+            stage.add(job['seconds'])
+            if 'error' in job:
+                results.put(ConversionResult(item, error=job['error'], stats=job['stats']))
+                continue
+            await to_convert.put(job)
+
+    def _read_one(self, readme_path):
+        """Stat and read one source, unless it is left to the streaming path"""
+        start = time.perf_counter()
+        stats = {}
+        job = {'source': readme_path, 'stats': stats, 'content': None}
+        try:
+            stats['bytes'] = os.path.getsize(readme_path)
+            if self.stream_threshold is None or stats['bytes'] < self.stream_threshold:
+                job['content'] = readme_engine.read_source(readme_path, stats)
+        except Exception as e:
+            job['error'] = str(e)
+        job['seconds'] = time.perf_counter() - start
+        return job
+
+    async def _convert(self, loop, cpu, to_convert, to_write, results, stop):
+        stage = self.stages['convert']
+        while True:
+            stage.sample(to_convert.qsize())
+            job = await to_convert.get()
+            if job is None:
+                return
+            if stop.is_set() or self.cancelled():
+                # Sources already read are dropped, not converted
+                continue
+            source = job['source']
+            try:
+                if job['content'] is None:
+                    # Too large to hold in memory; converted and written in one go
+                    result = await loop.run_in_executor(cpu, readme_engine._convert_one, (
+                        source, self.output_dir, self.options, self.stream_threshold,
+                        self.split_jobs
+                    ))
+                    stage.add(result.stats.get('seconds', 0.0))
+                    results.put(result)
+                    continue
+                output_path, page, error, stats, seconds = await loop.run_in_executor(
+                    cpu, _render_job, (source, job['content'], self.output_dir, self.options,
+                                       job['stats'], self.split_jobs)
+                )
+            except Exception as e:
+                # Timeouts, crashed or broken pools: this file fails, the batch goes on
+                job['content'] = None
+                results.put(ConversionResult(source, error=str(e) or type(e).__name__,
+                                             stats=job['stats']))
+                continue
+            # The source is no longer needed; only the page moves on
+            job['content'] = None
+            stage.add(seconds)
+            if error:
+                results.put(ConversionResult(source, error=error, stats=stats))
+                continue
+            await to_write.put((source, output_path, page, stats, job['seconds'] + seconds))
+
+    async def _write(self, loop, io, to_write, results):
+        stage = self.stages['write']
+        while True:
+            stage.sample(to_write.qsize())
+            job = await to_write.get()
+            if job is None:
+                return
+            source, output_path, page, stats, seconds = job
+            start = time.perf_counter()
+            result = ConversionResult(source, output=output_path, stats=stats)
+            try:
+                await loop.run_in_executor(io, readme_engine.write_page, output_path, page,
+                                           stats, self.options)
+            except Exception as e:
+                result.output, result.error = None, str(e)
+            elapsed = time.perf_counter() - start
+            stage.add(elapsed)
+            stats['seconds'] = seconds + elapsed
+            results.put(result)
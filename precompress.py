@@ -0,0 +1,133 @@
+"""Pre-compressed siblings of written pages for static hosting.
+
+Servers such as nginx with ``gzip_static`` (or ``brotli_static``) serve
+``page.html.gz`` / ``page.html.br`` instead of compressing ``page.html`` on
+every request.  SiblingWriter produces those files from the HTML as it is
+written, so no page is read back.  Compression runs in whichever thread or
+worker writes the page; zlib and brotli release the GIL, so the pipeline's
+writer threads compress several pages at once.
+
+Siblings of formats that are turned off are deleted when their page is
+rewritten, so a server never prefers a stale copy.  Brotli needs the
+optional ``brotli`` package.
+"""
+import gzip
+import os
+import threading
+from pathlib import Path
+
+# Format name -> file suffix added to the page name
+FORMATS = {'gzip': '.gz', 'br': '.br'}
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def brotli_available():
+    """Return True if the brotli package can be imported"""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def sibling_path(output_path, fmt):
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + FORMATS[fmt])
+
+
+class SiblingWriter:
+    """Writes the compressed siblings of one page while its HTML is produced
+
+    write() takes the encoded page in one or more chunks; commit() moves
+    the finished files into place.  The files are written next to their
+    final names and only renamed on commit, so a failed page leaves no
+    partial siblings behind.
+    """
+
+    def __init__(self, output_path, options=None, stats=None):
+        options = options or {}
+        self.output_path = Path(output_path)
+        self.formats = [fmt for fmt in options.get('precompress') or () if fmt in FORMATS]
+        self.stats = stats
+        self._streams = []
+        for fmt in self.formats:
+            path = sibling_path(self.output_path, fmt)
+            # Unique per thread: writer threads may share an output name
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            raw = open(tmp_path, 'wb')
+            if fmt == 'gzip':
+                # No name or time in the header, so unchanged pages compress
+                # to identical files
+                compressor = gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0,
+                                           compresslevel=options.get('gzip_level', GZIP_LEVEL))
+            else:
+                import brotli
+                compressor = brotli.Compressor(
+                    quality=options.get('brotli_quality', BROTLI_QUALITY)
+                )
+            self._streams.append((fmt, path, tmp_path, raw, compressor))
+
+    def write(self, data):
+        for fmt, path, tmp_path, raw, compressor in self._streams:
+            if fmt == 'gzip':
+                compressor.write(data)
+            else:
+                raw.write(compressor.process(data))
+
+    def commit(self):
+        """Finish every sibling and delete those of formats turned off"""
+        sizes = {}
+        for fmt, path, tmp_path, raw, compressor in self._streams:
+            if fmt == 'gzip':
+                compressor.close()
+            else:
+                raw.write(compressor.finish())
+            sizes[fmt] = raw.tell()
+            raw.close()
+            os.replace(tmp_path, path)
+        self._streams = []
+        for fmt in FORMATS:
+            if fmt not in sizes:
+                sibling_path(self.output_path, fmt).unlink(missing_ok=True)
+        if self.stats is not None and sizes:
+            self.stats['compressed'] = sizes
+
+    def discard(self):
+        """Drop the unfinished siblings"""
+        for fmt, path, tmp_path, raw, compressor in self._streams:
+            raw.close()
+            tmp_path.unlink(missing_ok=True)
+        self._streams = []
+
+
+def remove_siblings(output_path):
+    """Delete every compressed sibling of a page"""
+    for fmt in FORMATS:
+        sibling_path(output_path, fmt).unlink(missing_ok=True)
+
+
+def write_siblings(output_path, data, options=None, stats=None):
+    """Write the compressed siblings of a page whose encoded HTML is data"""
+    writer = SiblingWriter(output_path, options, stats)
+    try:
+        writer.write(data)
+        writer.commit()
+    except BaseException:
+        writer.discard()
+        raise
+
+
+def summarize_compression(results):
+    """Add up the page and compressed sizes of a batch, per format"""
+    totals = {}
+    for result in results:
+        compressed = result.stats.get('compressed')
+        if not compressed:
+            continue
+        for fmt, size in compressed.items():
+            total = totals.setdefault(fmt, {'pages': 0, 'bytes': 0, 'html_bytes': 0})
+            total['pages'] += 1
+            total['bytes'] += size
+            total['html_bytes'] += result.stats.get('html_bytes', 0)
+    return totals
@@ -0,0 +1,127 @@
+"""Per-user preferences kept in memory and saved in the background.
+
+Preferences live in a fixed per-user location instead of the working
+directory.  PreferencesStore loads them once; changes update the in-memory
+copy and schedule a save, so a burst of changes (dropping files, editing
+several options) produces a single write.  Files are written to a temporary
+file and renamed into place, so a crash never leaves a truncated file.
+"""
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+CONFIG_DIR_ENV = 'READMEHTML_CONFIG_DIR'
+PREFERENCES_NAME = 'preferences.json'
+# preferences.json next to the application, used before per-user files existed
+LEGACY_PREFERENCES_PATH = Path(__file__).resolve().parent / PREFERENCES_NAME
+
+
+def default_config_dir():
+    """Return the per-user configuration directory for README HTML Generator"""
+    if os.environ.get(CONFIG_DIR_ENV):
+        return Path(os.environ[CONFIG_DIR_ENV])
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or Path.home() / 'AppData' / 'Roaming'
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Application Support'
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or Path.home() / '.config'
+    return Path(base) / 'readmehtmlgenerator'
+
+
+def default_preferences_path():
+    return default_config_dir() / PREFERENCES_NAME
+
+
+def read_preferences(path, defaults):
+    """Read a preferences file, falling back to the legacy file and defaults
+
+    Returns a fresh dict the caller may modify.
+    """
+    candidates = [Path(path)]
+    if Path(path) != LEGACY_PREFERENCES_PATH:
+        candidates.append(LEGACY_PREFERENCES_PATH)
+    for candidate in candidates:
+        try:
+            with open(candidate, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+    return json.loads(json.dumps(defaults))
+
+
+def write_preferences(path, prefs):
+    """Write preferences atomically (temporary file + rename)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(prefs, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class PreferencesStore:
+    """In-memory preferences with debounced, atomic saving"""
+
+    def __init__(self, path=None, defaults=None, delay=0.5):
+        self.path = Path(path) if path else default_preferences_path()
+        self.delay = delay
+        self.saves = 0
+        self._defaults = defaults or {}
+        self._data = read_preferences(self.path, self._defaults)
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
+
+    def snapshot(self):
+        """Return a deep copy of every preference"""
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+    def get(self, key, default=None):
+        """Return a copy of one top-level preference"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            return json.loads(json.dumps(self._data[key]))
+
+    def set(self, key, value):
+        """Replace one top-level preference and schedule a save"""
+        with self._lock:
+            self._data[key] = json.loads(json.dumps(value))
+            self._schedule()
+
+    def update_section(self, key, values):
+        """Merge values into a dict-valued preference and schedule a save"""
+        with self._lock:
+            section = self._data.setdefault(key, {})
+            section.update(json.loads(json.dumps(values)))
+            self._schedule()
+
+    def replace(self, prefs):
+        """Replace every preference and schedule a save"""
+        with self._lock:
+            self._data = json.loads(json.dumps(prefs))
+            self._schedule()
+
+    def _schedule(self):
+        self._dirty = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Save pending changes now"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            write_preferences(self.path, self._data)
+            self._dirty = False
+            self.saves += 1
@@ -0,0 +1,233 @@
+"""Watch mode: a localhost preview server with live reload.
+
+Rendered pages are kept in memory and served by an in-process HTTP server.
+A watcher thread polls the previewed files and styles.css, re-renders only
+what changed and notifies open browser tabs through a server-sent events
+stream, so no temporary files are written.
+"""
+import html
+import mimetypes
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import readme_engine
+
+RELOAD_SCRIPT = """<script>
+(function () {
+    var source = new EventSource('/__events?page=%(page)s&version=%(version)d');
+    source.onmessage = function () { location.reload(); };
+})();
+</script>
+"""
+
+
+class PreviewServer:
+    """Serves live-reloading previews of Markdown files on localhost"""
+
+    def __init__(self, options=None, host='127.0.0.1', port=0, poll_interval=0.05):
+        self.options = options
+        self.poll_interval = poll_interval
+        self._pages = {}
+        self._ids = {}
+        self._changed = threading.Condition()
+        self._stopping = threading.Event()
+        self._styles_mtime = self._mtime(readme_engine.STYLES_PATH)
+        self._threads = []
+
+        self.httpd = ThreadingHTTPServer((host, port), _PreviewHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.preview = self
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """Start serving and watching in background threads"""
+        for target in (self.httpd.serve_forever, self._watch):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    @property
+    def stopped(self):
+        return self._stopping.is_set()
+
+    def stop(self):
+        """Stop watching, release waiting tabs and shut the server down"""
+        self._stopping.set()
+        with self._changed:
+            self._changed.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def add(self, path):
+        """Start previewing a file and return its URL"""
+        source = Path(path).resolve()
+        with self._changed:
+            page_id = self._ids.get(source)
+            if page_id is None:
+                page_id = str(len(self._ids))
+                self._ids[source] = page_id
+                self._pages[page_id] = {
+                    'source': source, 'html': '', 'version': 0, 'mtime': None
+                }
+        self._render(page_id)
+        return self.url_for(path)
+
+    def url_for(self, path):
+        source = Path(path).resolve()
+        return self.base_url + f"{self._ids[source]}/{quote(source.stem)}.html"
+
+    def page(self, page_id):
+        with self._changed:
+            page = self._pages.get(page_id)
+            return dict(page) if page else None
+
+    def pages(self):
+        with self._changed:
+            return [(page_id, dict(page)) for page_id, page in self._pages.items()]
+
+    def wait_for_change(self, page_id, version, timeout):
+        """Block until a page moves past version; returns False on timeout"""
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self._stopping.is_set()
+                or self._pages[page_id]['version'] != version,
+                timeout
+            ) and not self._stopping.is_set()
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _render(self, page_id):
+        with self._changed:
+            source = self._pages[page_id]['source']
+        mtime = self._mtime(source)
+
+        start = time.perf_counter()
+        try:
+            page = readme_engine.convert_readme_to_html(
+                source, preview_mode=True, options=self.options
+            )
+        except Exception as e:
+            page = "<!DOCTYPE html><html><body><h1>{}</h1><pre>{}</pre></body></html>".format(
+                html.escape(source.name), html.escape(str(e))
+            )
+        elapsed = (time.perf_counter() - start) * 1000
+
+        with self._changed:
+            entry = self._pages[page_id]
+            entry['html'] = page
+            entry['mtime'] = mtime
+            entry['render_ms'] = elapsed
+            entry['version'] += 1
+            self._changed.notify_all()
+
+    def _watch(self):
+        while not self._stopping.wait(self.poll_interval):
+            styles_mtime = self._mtime(readme_engine.STYLES_PATH)
+            restyle = styles_mtime != self._styles_mtime
+            self._styles_mtime = styles_mtime
+
+            for page_id, page in self.pages():
+                if restyle or self._mtime(page['source']) != page['mtime']:
+                    self._render(page_id)
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    """Routes: / (index), /__events (reload stream), /<page>/... (pages and assets)"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        preview = self.server.preview
+        url = urlsplit(self.path)
+        parts = unquote(url.path).strip('/').split('/', 1)
+
+        if url.path == '/':
+            self._send_index(preview)
+        elif url.path == '/__events':
+            query = parse_qs(url.query)
+            self._send_events(preview, query.get('page', [''])[0],
+                              int(query.get('version', ['0'])[0]))
+        elif len(parts) == 2 and preview.page(parts[0]):
+            page_id, name = parts
+            page = preview.page(page_id)
+            if name == f"{page['source'].stem}.html":
+                self._send_page(page_id, page)
+            else:
+                self._send_asset(page['source'].parent, name)
+        else:
+            self.send_error(404)
+
+    def _send(self, body, content_type):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_index(self, preview):
+        items = ''.join(
+            '<li><a href="{}">{}</a></li>'.format(
+                preview.url_for(page['source']), html.escape(str(page['source']))
+            )
+            for _, page in preview.pages()
+        )
+        self._send(f"<!DOCTYPE html><html><body><ul>{items}</ul></body></html>",
+                   'text/html; charset=utf-8')
+
+    def _send_page(self, page_id, page):
+        script = RELOAD_SCRIPT % {'page': page_id, 'version': page['version']}
+        body = page['html']
+        index = body.rfind('</body>')
+        if index == -1:
+            body += script
+        else:
+            body = body[:index] + script + body[index:]
+        self._send(body, 'text/html; charset=utf-8')
+
+    def _send_asset(self, root, name):
+        """Serve files next to the previewed README, such as images"""
+        path = (root / name).resolve()
+        if root not in path.parents or not path.is_file():
+            self.send_error(404)
+            return
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        self._send(path.read_bytes(), content_type)
+
+    def _send_events(self, preview, page_id, version):
+        if not preview.page(page_id):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        try:
+            while True:
+                if preview.wait_for_change(page_id, version, timeout=15):
+                    self.wfile.write(b"data: reload\n\n")
+                    self.wfile.flush()
+                    return
+                if preview.stopped:
+                    return
+                # Keep-alive comment so proxies and browsers hold the stream open
+                self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
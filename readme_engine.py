@@ -0,0 +1,1394 @@
+"""GUI-free conversion engine for README HTML Generator.
+
+Everything needed to turn Markdown READMEs into styled HTML lives here so
+that conversions can run on build servers without a display.  This module
+must never import tkinter or tkinterdnd2.
+
+Command line usage::
+
+    python readme_engine.py --out site/ --jobs 4 README.md docs/*.md
+    python readme_engine.py --out site/ --exclude 'drafts/' path/to/repo
+"""
+import argparse
+import hashlib
+import html
+import io
+import json
+import os
+import string
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from pathlib import Path
+from urllib.parse import quote
+
+from build_manifest import BuildManifest
+from file_scanner import DEFAULT_EXCLUDE, DEFAULT_INCLUDE, DirectoryScanner
+from highlight_cache import HIGHLIGHT_CACHE, summarize_counts
+from image_embed import IMAGE_EMBEDDER, INLINE_IMAGE_LIMIT
+from metrics import RunMetrics, profiled
+from minify import minify_css, minify_html, minify_js
+from precompress import (
+    BROTLI_QUALITY, FORMATS, GZIP_LEVEL, SiblingWriter, brotli_available, remove_siblings,
+    summarize_compression, write_siblings
+)
+from preferences_store import default_preferences_path, read_preferences
+import site_map
+from search_index import INDEX_DIRNAME, WIDGET_NAME, SearchIndex, SectionCollector
+from site_map import SiteMap
+from markdown_sections import (
+    SECTION_CHARS, SECTION_EXTENSION_CONFIGS, HeadingResolver, collect_references,
+    convert_section, iter_sections
+)
+
+BASE_DIR = Path(__file__).resolve().parent
+STYLES_PATH = BASE_DIR / 'styles.css'
+PREFERENCES_PATH = default_preferences_path()
+
+MARKDOWN_EXTENSIONS = ('fenced_code', 'codehilite', 'tables', 'toc')
+
+# Sources at least this large are converted by the streaming path
+STREAM_THRESHOLD = 32 * 1024 * 1024
+
+# Sources at least this large are split into sections converted in parallel
+# when more than one split job is configured
+SPLIT_THRESHOLD = 1024 * 1024
+# Smallest section handed to a split worker
+SPLIT_SECTION_CHARS = 64 * 1024
+
+def _new_file_mode():
+    # os.umask() can only be read by setting it
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# Permissions open() gives a new file; mkstemp() creates files private
+NEW_FILE_MODE = _new_file_mode()
+
+# Seconds one file of a batch may take before its worker is killed; 0 for
+# none.  Limits are opt-in: they move the batch into supervised workers
+FILE_TIMEOUT = 0
+
+DEFAULT_PREFERENCES = {
+    "recent_files": [],
+    "current_theme": "default",
+    "custom_themes": {},
+    "export_options": {
+        "mobile": False,
+        "print": False,
+        "toc": True,
+        "external_assets": False,
+        "embed_images": True,
+        "inline_image_limit": INLINE_IMAGE_LIMIT,
+        "site_mode": False,
+        "search_index": False,
+        "minify": False,
+        "precompress": [],
+        "gzip_level": GZIP_LEVEL,
+        "brotli_quality": BROTLI_QUALITY
+    },
+    "export_settings": {
+        "filename_pattern": "{name}",
+        "metadata": {
+            "author": "",
+            "description": "",
+            "keywords": ""
+        }
+    },
+    "conversion": {
+        "jobs": 0,
+        "max_in_flight": 0,
+        "split_jobs": 1,
+        "file_timeout": FILE_TIMEOUT,
+        "memory_limit_mb": 0,
+        "metrics_dir": "",
+        "profile": False
+    },
+    "folders": {
+        "include": list(DEFAULT_INCLUDE),
+        "exclude": list(DEFAULT_EXCLUDE),
+        "gitignore": True
+    }
+}
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of converting one file in a batch"""
+    source: str
+    output: str = None
+    error: str = None
+    skipped: bool = False
+    stats: dict = field(default_factory=dict)
+
+
+class MarkdownRegistry:
+    """Keeps one reusable Markdown instance per thread and configuration
+
+    Building a Markdown object resolves and instantiates every extension,
+    which costs more than parsing a small README.  Instances are reset
+    between documents instead of being rebuilt.  Worker processes each get
+    their own registry through the module-level MARKDOWN_REGISTRY.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.constructed = 0
+        self.reused = 0
+
+    def get(self, extensions=MARKDOWN_EXTENSIONS, extension_configs=None, stats=None):
+        """Return a freshly reset Markdown instance for this thread"""
+        key = (tuple(extensions), json.dumps(extension_configs or {}, sort_keys=True, default=repr))
+        instances = getattr(self._local, 'instances', None)
+        if instances is None:
+            instances = self._local.instances = {}
+
+        md = instances.get(key)
+        reused = md is not None
+        if not reused:
+            # Imported here so that `--help` and other cheap paths stay fast
+            import markdown
+            md = markdown.Markdown(
+                extensions=list(extensions),
+                extension_configs=extension_configs or {}
+            )
+            instances[key] = md
+
+        with self._lock:
+            if reused:
+                self.reused += 1
+            else:
+                self.constructed += 1
+        if stats is not None:
+            stats['markdown_reused'] = reused
+        return md.reset()
+
+    def stats(self):
+        """Return construction counters for this process"""
+        with self._lock:
+            return {'constructed': self.constructed, 'reused': self.reused}
+
+
+MARKDOWN_REGISTRY = MarkdownRegistry()
+
+
+def load_preferences(path=PREFERENCES_PATH):
+    """Load preferences from a JSON file, falling back to the defaults"""
+    return read_preferences(path, DEFAULT_PREFERENCES)
+
+
+def folder_options(prefs):
+    """Return the folder scanning settings of a preferences dict"""
+    return dict(DEFAULT_PREFERENCES['folders'], **prefs.get('folders', {}))
+
+
+def export_options(prefs):
+    """Flatten the export options and settings of a preferences dict"""
+    defaults = DEFAULT_PREFERENCES['export_settings']
+    settings = prefs.get('export_settings', {})
+
+    options = dict(DEFAULT_PREFERENCES['export_options'])
+    options.update(prefs.get('export_options', {}))
+    options['filename_pattern'] = settings.get(
+        'filename_pattern', defaults['filename_pattern']
+    )
+    options['metadata'] = dict(defaults['metadata'], **settings.get('metadata', {}))
+    return options
+
+
+def get_theme_css():
+    """Get theme CSS including custom styles"""
+    with open(STYLES_PATH, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def get_theme_js():
+    """Get theme JavaScript"""
+    return """
+        // Theme toggler
+        function toggleDarkMode() {
+            document.body.classList.toggle('dark-theme');
+            localStorage.setItem('darkMode', document.body.classList.contains('dark-theme'));
+        }
+
+        // Check for saved theme preference
+        if (localStorage.getItem('darkMode') === 'true') {
+            document.body.classList.add('dark-theme');
+        }
+
+        // Add theme toggle button
+        const themeToggle = document.createElement('div');
+        themeToggle.className = 'theme-toggle';
+        themeToggle.innerHTML = `
+            <button onclick="toggleDarkMode()">Toggle Theme</button>
+        `;
+        document.body.appendChild(themeToggle);
+        """
+
+
+def get_html_template():
+    """Get HTML template"""
+    return """<!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1">
+            <title>{title}</title>{meta}
+            {stylesheet}
+        </head>
+        <body class="mode-transition">
+            <div class="content">
+                {content}
+            </div>
+            {script}
+        </body>
+        </html>"""
+
+
+def compile_template(template):
+    """Split a str.format template into literal and field segments once"""
+    segments = []
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        if literal:
+            segments.append((False, literal))
+        if field_name is not None:
+            segments.append((True, field_name))
+    return tuple(segments)
+
+
+class ThemeSnapshot:
+    """Immutable view of the theme assets at one point in time"""
+
+    def __init__(self, css, js, template, mtime):
+        self.css = css
+        self.js = js
+        self.template = template
+        self.mtime = mtime
+        self.segments = compile_template(template)
+        self.inline_stylesheet = '<style>{}</style>'.format(css)
+        self.inline_script = '<script>{}</script>'.format(js)
+
+        digest = hashlib.sha256()
+        for part in (css, template, js):
+            digest.update(part.encode('utf-8'))
+        self.fingerprint = digest.hexdigest()
+
+        self.asset_names = {}
+        for kind, stem, content in (('css', 'styles', css), ('js', 'theme', js)):
+            content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+            self.asset_names[kind] = f"{stem}.{content_hash}.{kind}"
+        self._minified = None
+
+    def minified(self):
+        """This theme with its stylesheet and script minified
+
+        Built on first use and kept with the snapshot, so a batch minifies
+        the theme once per process, not once per page.
+        """
+        if self._minified is None:
+            self._minified = ThemeSnapshot(minify_css(self.css), minify_js(self.js),
+                                           self.template, self.mtime)
+        return self._minified
+
+    def render(self, **values):
+        """Fill the precompiled template; equivalent to template.format()"""
+        return ''.join(
+            values[text] if is_field else text
+            for is_field, text in self.segments
+        )
+
+    def render_parts(self, split_field, **values):
+        """Render the template around split_field, returning (head, tail)"""
+        head, tail = [], []
+        current = head
+        for is_field, text in self.segments:
+            if is_field and text == split_field:
+                current = tail
+            else:
+                current.append(values[text] if is_field else text)
+        return ''.join(head), ''.join(tail)
+
+
+class ThemeAssets:
+    """Loads the theme CSS, JS and template once and shares them
+
+    styles.css is re-read only when its modification time changes.  The
+    current ThemeSnapshot is immutable, so worker threads can use it
+    without locking; the lock only guards reloading.
+    """
+
+    def __init__(self, styles_path=STYLES_PATH):
+        self.styles_path = styles_path
+        self.loads = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.styles_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def snapshot(self):
+        """Return the current ThemeSnapshot, reloading it if stale"""
+        mtime = self._mtime()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.mtime != mtime:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.mtime != mtime:
+                    with open(self.styles_path, 'r', encoding='utf-8') as f:
+                        css = f.read()
+                    snapshot = ThemeSnapshot(css, get_theme_js(), get_html_template(), mtime)
+                    self._snapshot = snapshot
+                    self.loads += 1
+        return snapshot
+
+
+THEME_ASSETS = ThemeAssets()
+
+_shared_asset_dirs = set()
+
+
+def shared_asset_names():
+    """Return content-hashed filenames for the shared stylesheet and script"""
+    return dict(THEME_ASSETS.snapshot().asset_names)
+
+
+def ensure_shared_assets(directory, minify=False):
+    """Write the shared stylesheet and script into directory once
+
+    Filenames carry a hash of their content, so browsers can cache them
+    forever and a theme change never serves a stale file.  With minify the
+    minified assets are written instead.  Returns the filenames pages
+    should link to.
+    """
+    directory = Path(directory)
+    theme = THEME_ASSETS.snapshot()
+    if minify:
+        theme = theme.minified()
+    names = theme.asset_names
+    key = (str(directory.resolve()), names['css'], names['js'])
+    if key in _shared_asset_dirs:
+        return names
+
+    for kind, content in (('css', theme.css), ('js', theme.js)):
+        path = directory / names[kind]
+        if not path.exists():
+            # Write then rename, so parallel workers and threads never see a partial file
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(content, encoding='utf-8')
+            os.replace(tmp_path, path)
+    _shared_asset_dirs.add(key)
+    return names
+
+
+def build_fingerprint(options=None):
+    """Hash everything besides the source that affects a rendered page"""
+    digest = hashlib.sha256()
+    digest.update(THEME_ASSETS.snapshot().fingerprint.encode('utf-8'))
+    digest.update(json.dumps(MARKDOWN_EXTENSIONS).encode('utf-8'))
+    digest.update(json.dumps(options or {}, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def add_timing(stats, stage, seconds, start=None):
+    """Add seconds to stats['timings'][stage] if stats are collected
+
+    Each call is also kept as a span in stats['spans']; start is the
+    time.time() at which the stage began.
+    """
+    if stats is not None:
+        timings = stats.setdefault('timings', {})
+        timings[stage] = timings.get(stage, 0.0) + seconds
+        stats.setdefault('spans', []).append({
+            'stage': stage,
+            'start': start if start is not None else time.time() - seconds,
+            'seconds': seconds,
+        })
+
+
+@contextmanager
+def timed(stats, stage):
+    """Add the time spent in the block to stats['timings'][stage]"""
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(stats, stage, time.perf_counter() - start, started)
+
+
+def render_markdown(content, stats=None):
+    """Convert Markdown text to an HTML fragment and its TOC tokens
+
+    Time spent highlighting code is recorded apart from parsing.
+    """
+    md = MARKDOWN_REGISTRY.get(stats=stats)
+    HIGHLIGHT_CACHE.install()
+    HIGHLIGHT_CACHE.take_counts()
+    HIGHLIGHT_CACHE.take_seconds()
+    start = time.perf_counter()
+    body = md.convert(content)
+    HIGHLIGHT_CACHE.flush()
+    highlight_seconds = HIGHLIGHT_CACHE.take_seconds()
+    add_timing(stats, 'parse', time.perf_counter() - start - highlight_seconds)
+    add_timing(stats, 'highlight', highlight_seconds)
+    if stats is not None:
+        stats['highlight'] = HIGHLIGHT_CACHE.take_counts()
+    return body, md.toc_tokens
+
+
+def render_toc(tokens):
+    """Render nested TOC tokens as a navigation block"""
+    def render_items(items):
+        lines = ['<ul>']
+        for item in items:
+            lines.append('<li><a href="#{}">{}</a>'.format(item['id'], item['name']))
+            if item['children']:
+                lines.append(render_items(item['children']))
+            lines.append('</li>')
+        lines.append('</ul>')
+        return '\n'.join(lines)
+
+    return (
+        '<div class="table-of-contents">\n'
+        '<h2>Table of Contents</h2>\n'
+        '<nav>\n{}\n</nav>\n'
+        '</div>\n'
+    ).format(render_items(tokens))
+
+
+def render_meta(metadata):
+    """Render the non-empty metadata entries as <meta> tags"""
+    return ''.join(
+        '\n            <meta name="{}" content="{}">'.format(name, html.escape(value))
+        for name, value in sorted(metadata.items())
+        if value
+    )
+
+
+def page_parts(title, toc_tokens=None, options=None, asset_names=None, root_url=None):
+    """Return the (head, tail) of the themed page around its body
+
+    The head ends with the table of contents when it is enabled.  The
+    stylesheet and script are inlined unless asset_names (as returned by
+    ensure_shared_assets) is given, in which case the page links to them.
+    root_url is the relative URL of the output directory, where the shared
+    assets and the search widget live.
+    """
+    options = options or export_options(DEFAULT_PREFERENCES)
+    theme = THEME_ASSETS.snapshot()
+    if options.get('minify'):
+        theme = theme.minified()
+    if asset_names:
+        prefix = root_url or ''
+        stylesheet = '<link rel="stylesheet" href="{}">'.format(
+            quote(prefix + asset_names['css']))
+        script = '<script src="{}"></script>'.format(quote(prefix + asset_names['js']))
+    else:
+        stylesheet = theme.inline_stylesheet
+        script = theme.inline_script
+    if options.get('search_index') and root_url is not None:
+        script += '<script src="{}" defer></script>'.format(
+            quote(f"{root_url}{INDEX_DIRNAME}/{WIDGET_NAME}")
+        )
+
+    head, tail = theme.render_parts(
+        'content',
+        title=html.escape(title),
+        meta=render_meta(options.get('metadata', {})),
+        stylesheet=stylesheet,
+        script=script
+    )
+    if options.get('toc') and toc_tokens:
+        head += render_toc(toc_tokens)
+    return head, tail
+
+
+def minify_page(page, stats=None):
+    """Minify rendered HTML, counting its size before and after"""
+    with timed(stats, 'minify'):
+        minified = minify_html(page)
+    if stats is not None:
+        sizes = stats.setdefault('minify', {'before': 0, 'after': 0})
+        sizes['before'] += len(page)
+        sizes['after'] += len(minified)
+    return minified
+
+
+def render_page(title, body, toc_tokens=None, options=None, asset_names=None,
+                root_url=None):
+    """Wrap an HTML fragment into the full themed page"""
+    head, tail = page_parts(title, toc_tokens, options, asset_names, root_url)
+    return head + body + tail
+
+
+def output_path_for(readme_path, output_dir=None, options=None):
+    """Return the path the HTML for readme_path should be written to"""
+    site = site_map.active()
+    if site is not None and output_dir and readme_path in site:
+        return site.output_path(readme_path)
+    options = options or export_options(DEFAULT_PREFERENCES)
+    stem = Path(readme_path).stem
+    filename = options.get('filename_pattern', '{name}').format(name=stem) + '.html'
+    if output_dir:
+        return Path(output_dir) / filename
+    return Path(readme_path).with_name(filename)
+
+
+def embed_images(body, readme_path, output_path, options=None, stats=None, output_dir=None):
+    """Inline or copy the local images of a page body, if enabled
+
+    Copied images go to one assets folder in output_dir, which pages in
+    subfolders (site mode) reach through their root URL.
+    """
+    options = options or export_options(DEFAULT_PREFERENCES)
+    if not options.get('embed_images'):
+        return body
+    # Pages may use images anywhere in their site, but nothing outside it
+    site = site_map.active()
+    root = site.root if site is not None and readme_path in site else None
+    return IMAGE_EMBEDDER.embed(
+        body, Path(readme_path).resolve().parent, assets_dir_for(output_path, output_dir),
+        options.get('inline_image_limit', INLINE_IMAGE_LIMIT), stats, root,
+        root_url_for(output_path, output_dir)
+    )
+
+
+def assets_dir_for(output_path, output_dir):
+    """Folder shared assets and copied images of a page are written to"""
+    return Path(output_dir) if output_dir else output_path.parent
+
+
+def root_url_for(output_path, output_dir):
+    """Relative URL from a page to the output directory ('' or '../...')"""
+    if not output_dir:
+        return ''
+    relative = os.path.relpath(os.path.abspath(output_dir), os.path.abspath(output_path.parent))
+    return '' if relative == os.curdir else relative.replace(os.sep, '/') + '/'
+
+
+def collect_search(stats, collector, title):
+    """Store the sections a SectionCollector found for the search index"""
+    if stats is not None and collector is not None:
+        stats['search'] = {'title': collector.title(title), 'sections': collector.result()}
+
+
+def rewrite_links(body, readme_path, stats=None):
+    """In site mode, point links to other site sources at their pages"""
+    site = site_map.active()
+    if site is None:
+        return body
+    with timed(stats, 'links'):
+        return site.rewrite_links(body, readme_path, stats)
+
+
+def prepare_site(files, output_dir, options, roots=None):
+    """Build the SiteMap of a batch; returns the files as a list and the map
+
+    The site is keyed into options['site'], so the build fingerprint
+    changes (and every page is rebuilt) when pages are added or removed.
+    """
+    files = list(files)
+    site = SiteMap(files, output_dir, site_map.site_root(roots or files),
+                   options.get('filename_pattern', '{name}'))
+    site.prepare()
+    options['site'] = site.digest
+    return files, site
+
+
+def peak_rss_bytes():
+    """Return the peak resident set size of this process, if the OS reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _convert_section(args, stats=None):
+    """Process pool entry point converting one section of a split document"""
+    text, references = args
+    HIGHLIGHT_CACHE.install()
+    HIGHLIGHT_CACHE.take_seconds()
+    start = time.perf_counter()
+    md = MARKDOWN_REGISTRY.get(extension_configs=SECTION_EXTENSION_CONFIGS, stats=stats)
+    body, slugs, tokens = convert_section(md, text, references)
+    HIGHLIGHT_CACHE.flush()
+    highlight_seconds = HIGHLIGHT_CACHE.take_seconds()
+    timings = {
+        'parse': time.perf_counter() - start - highlight_seconds,
+        'highlight': highlight_seconds,
+    }
+    return body, slugs, tokens, HIGHLIGHT_CACHE.take_counts(), timings
+
+
+def _map_in_order(executor, fn, iterable, max_in_flight):
+    """Like executor.map(), but never submits more than max_in_flight items"""
+    pending = deque()
+    try:
+        for item in iterable:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def render_sections(sections, references, resolver, stats=None, executor=None,
+                    max_in_flight=2):
+    """Convert sections of one document, yielding resolved HTML in order
+
+    With an executor the sections are converted in its workers, at most
+    max_in_flight at a time.  Once the generator is exhausted, resolver
+    holds the TOC tokens of the whole document.
+    """
+    HIGHLIGHT_CACHE.install()
+    HIGHLIGHT_CACHE.take_counts()
+    jobs = ((section, references) for section in sections)
+    if executor is None:
+        converted = (_convert_section(job, stats) for job in jobs)
+    else:
+        converted = _map_in_order(executor, _convert_section, jobs, max_in_flight)
+
+    counts = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+    sections_converted = 0
+    for body, slugs, tokens, section_counts, timings in converted:
+        for name, value in section_counts.items():
+            counts[name] += value
+        for stage, seconds in timings.items():
+            add_timing(stats, stage, seconds)
+        sections_converted += 1
+        yield resolver.resolve(body, slugs, tokens)
+    if stats is not None:
+        stats['highlight'] = counts
+        stats['sections'] = sections_converted
+
+
+def render_markdown_split(content, jobs, stats=None):
+    """Render a large document with sections converted in parallel
+
+    The result is identical to render_markdown(): the document is cut at
+    top-level headings outside fenced code and the heading ids and TOC are
+    resolved over the whole document (see markdown_sections).
+    """
+    # StringIO splits on newlines only, like reading the file line by line
+    references = collect_references(io.StringIO(content), MARKDOWN_REGISTRY.get())
+    section_chars = max(SPLIT_SECTION_CHARS, len(content) // (jobs * 4))
+    resolver = HeadingResolver()
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        body = ''.join(render_sections(
+            iter_sections(io.StringIO(content), section_chars), references, resolver,
+            stats, executor, max_in_flight=jobs * 2
+        ))
+    return body.strip(), resolver.toc_tokens()
+
+
+def temporary_file(path, suffix='.tmp'):
+    """Create an empty file with a unique name next to path; returns its path"""
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=path.name + '.', suffix=suffix)
+    os.close(fd)
+    return Path(name)
+
+
+def convert_readme_streaming(readme_path, output_dir=None, options=None, stats=None,
+                             section_chars=SECTION_CHARS, split_jobs=1):
+    """Convert a large README with bounded memory; returns the output path
+
+    The source is read twice line by line: once to collect reference link
+    definitions, then section by section (see markdown_sections).  Section
+    HTML is spooled to a temporary file because the table of contents is
+    only known at the end; the page is then assembled from the template
+    head, the spooled body in chunks and the template tail.  The result is
+    identical to convert_readme_to_html().  With split_jobs above one the
+    sections are converted in that many worker processes.  Compressed
+    siblings are written from the same chunks as the page.
+    """
+    output_path = output_path_for(readme_path, output_dir, options)
+    minify = bool(options and options.get('minify'))
+    asset_names = None
+    if options and options.get('external_assets'):
+        asset_names = ensure_shared_assets(assets_dir_for(output_path, output_dir), minify)
+
+    with open(readme_path, 'r', encoding='utf-8') as f:
+        references = collect_references(f, MARKDOWN_REGISTRY.get())
+
+    collector = SectionCollector() if options and options.get('search_index') else None
+    # Unique names, so concurrent conversions of same-named sources into
+    # one folder never share a spool
+    spool_path = temporary_file(output_path, '.body.tmp')
+    tmp_path = None
+    executor = None
+    if split_jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=split_jobs)
+    try:
+        tmp_path = temporary_file(output_path)
+        with open(readme_path, 'r', encoding='utf-8') as src, \
+                open(spool_path, 'w', encoding='utf-8') as spool:
+            resolver = HeadingResolver()
+            # Trailing whitespace is held back so the body ends stripped
+            pending = ''
+            for body in render_sections(iter_sections(src, section_chars), references,
+                                        resolver, stats, executor,
+                                        max_in_flight=split_jobs * 2):
+                if collector is not None:
+                    with timed(stats, 'search'):
+                        collector.feed(body)
+                with timed(stats, 'images'):
+                    body = embed_images(body, readme_path, output_path, options, stats,
+                                        output_dir)
+                body = rewrite_links(body, readme_path, stats)
+                if minify:
+                    # Sections start and end at block-level tags, so they
+                    # minify the same on their own as in the whole page
+                    body = minify_page(body, stats)
+                stripped = body.rstrip()
+                with timed(stats, 'write'):
+                    if stripped:
+                        spool.write(pending)
+                        spool.write(stripped)
+                        pending = body[len(stripped):]
+                    else:
+                        pending += body
+
+        with timed(stats, 'template'):
+            head, tail = page_parts(Path(readme_path).stem, resolver.toc_tokens(),
+                                    options, asset_names,
+                                    root_url_for(output_path, output_dir))
+        if minify:
+            head, tail = minify_page(head, stats), minify_page(tail, stats)
+        siblings = None
+        if options and options.get('precompress'):
+            siblings = SiblingWriter(output_path, options, stats)
+        try:
+            html_bytes = 0
+            with timed(stats, 'write'), open(spool_path, 'r', encoding='utf-8') as spool, \
+                    open(tmp_path, 'w', encoding='utf-8') as out:
+                for chunk in chain([head], iter(lambda: spool.read(1 << 20), ''), [tail]):
+                    out.write(chunk)
+                    if siblings is not None:
+                        with timed(stats, 'compress'):
+                            data = chunk.encode('utf-8')
+                            html_bytes += len(data)
+                            siblings.write(data)
+            os.chmod(tmp_path, NEW_FILE_MODE)
+            os.replace(tmp_path, output_path)
+            if siblings is not None:
+                with timed(stats, 'compress'):
+                    siblings.commit()
+                if stats is not None:
+                    stats['html_bytes'] = html_bytes
+            else:
+                remove_siblings(output_path)
+        except BaseException:
+            if siblings is not None:
+                siblings.discard()
+            raise
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        for path in (spool_path, tmp_path):
+            if path is not None:
+                path.unlink(missing_ok=True)
+
+    collect_search(stats, collector, Path(readme_path).stem)
+    if stats is not None:
+        stats['streamed'] = True
+    return output_path
+
+
+def convert_readme_to_html(readme_path, output_dir=None, preview_mode=False, options=None,
+                           stats=None, stream_threshold=None, split_jobs=1):
+    """Convert a README file to HTML
+
+    Returns the rendered page in preview mode, otherwise the output path.
+    Per-file counters are recorded into the optional stats dict.  Files of
+    at least stream_threshold bytes go through convert_readme_streaming().
+    With split_jobs above one, files of at least SPLIT_THRESHOLD bytes are
+    converted in that many worker processes by render_markdown_split().
+    """
+    if (not preview_mode and stream_threshold is not None
+            and os.path.getsize(readme_path) >= stream_threshold):
+        return convert_readme_streaming(readme_path, output_dir, options, stats,
+                                        split_jobs=split_jobs)
+
+    content = read_source(readme_path, stats)
+    if preview_mode:
+        body, toc_tokens = render_body(content, stats, split_jobs)
+        with timed(stats, 'template'):
+            return render_page(Path(readme_path).stem, body, toc_tokens, options)
+
+    output_path, page = render_readme(readme_path, content, output_dir, options, stats,
+                                      split_jobs)
+    write_page(output_path, page, stats, options)
+    return output_path
+
+
+def read_source(readme_path, stats=None):
+    """Read a Markdown source file"""
+    with timed(stats, 'read'), open(readme_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def render_body(content, stats=None, split_jobs=1):
+    """Render Markdown text to a body fragment and its TOC tokens"""
+    if split_jobs > 1 and len(content) >= SPLIT_THRESHOLD:
+        return render_markdown_split(content, split_jobs, stats)
+    return render_markdown(content, stats)
+
+
+def render_readme(readme_path, content, output_dir=None, options=None, stats=None,
+                  split_jobs=1):
+    """Render the page for a README whose content was already read
+
+    Returns the output path and the page; nothing is written, so reading,
+    rendering and writing can run in different stages (see pipeline).
+    """
+    body, toc_tokens = render_body(content, stats, split_jobs)
+    output_path = output_path_for(readme_path, output_dir, options)
+    title = Path(readme_path).stem
+    if options and options.get('search_index'):
+        with timed(stats, 'search'):
+            collector = SectionCollector()
+            collector.feed(body)
+            collect_search(stats, collector, title)
+    with timed(stats, 'images'):
+        body = embed_images(body, readme_path, output_path, options, stats, output_dir)
+    body = rewrite_links(body, readme_path, stats)
+    with timed(stats, 'template'):
+        asset_names = None
+        if options and options.get('external_assets'):
+            asset_names = ensure_shared_assets(assets_dir_for(output_path, output_dir),
+                                               options.get('minify'))
+        page = render_page(title, body, toc_tokens, options, asset_names,
+                           root_url_for(output_path, output_dir))
+    if options and options.get('minify'):
+        page = minify_page(page, stats)
+    return output_path, page
+
+
+def write_page(output_path, page, stats=None, options=None):
+    """Write a rendered page and the compressed siblings options ask for"""
+    with timed(stats, 'write'), open(output_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    if options and options.get('precompress'):
+        with timed(stats, 'compress'):
+            data = page.encode('utf-8')
+            write_siblings(output_path, data, options, stats)
+        if stats is not None:
+            stats['html_bytes'] = len(data)
+    else:
+        remove_siblings(output_path)
+
+
+# Rendered by warm_worker(): a labelled and an unlabelled code block load
+# the highlighter and every lexer the guessing path may need
+WARM_UP_SOURCE = "# Title\n\n```python\nx = 1\n```\n\n```\nx = 1\n```\n\n| a |\n|---|\n| b |\n"
+
+
+def warm_worker(site=None):
+    """Worker initializer that loads the renderer before any file is converted
+
+    Markdown, its extensions and Pygments are imported lazily, on the first
+    conversion.  A worker under a memory limit runs this before the limit
+    is set, so the imports are part of its start-up size and not charged to
+    the first file.
+    """
+    site_map.activate(site)
+    import sqlite3  # noqa: F401  (opened lazily by the highlight cache)
+    MARKDOWN_REGISTRY.get().convert(WARM_UP_SOURCE)
+    HIGHLIGHT_CACHE.install()
+
+
+def _convert_one(args):
+    """Process pool entry point returning a ConversionResult"""
+    readme_path, output_dir, options, stream_threshold, split_jobs = args
+    result = ConversionResult(readme_path)
+    start = time.perf_counter()
+    try:
+        result.stats['bytes'] = os.path.getsize(readme_path)
+        result.output = str(convert_readme_to_html(
+            readme_path, output_dir, options=options, stats=result.stats,
+            stream_threshold=stream_threshold, split_jobs=split_jobs
+        ))
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    result.stats['seconds'] = time.perf_counter() - start
+    result.stats['peak_rss'] = peak_rss_bytes()
+    return result
+
+
+def summarize_markdown_reuse(results):
+    """Count Markdown constructions performed and saved across a batch"""
+    flags = [r.stats['markdown_reused'] for r in results if 'markdown_reused' in r.stats]
+    reused = sum(flags)
+    return {'constructed': len(flags) - reused, 'reused': reused}
+
+
+def summarize_highlight_cache(results):
+    """Add up the highlight cache counters of a batch"""
+    counts = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+    for result in results:
+        for name, value in result.stats.get('highlight', {}).items():
+            counts[name] += value
+    return summarize_counts(counts)
+
+
+def summarize_images(results):
+    """Add up the embedded image counters of a batch"""
+    counts = {'inlined': 0, 'copied': 0, 'missing': 0, 'skipped': 0}
+    for result in results:
+        for name, value in result.stats.get('images', {}).items():
+            counts[name] += value
+    return counts
+
+
+def summarize_minify(results):
+    """Add up the page sizes before and after minification across a batch"""
+    totals = {'pages': 0, 'before': 0, 'after': 0}
+    for result in results:
+        sizes = result.stats.get('minify')
+        if sizes:
+            totals['pages'] += 1
+            totals['before'] += sizes['before']
+            totals['after'] += sizes['after']
+    return totals
+
+
+def resolve_jobs(jobs):
+    """Turn a configured worker count into a real one; 0 means one per CPU"""
+    if not jobs or jobs < 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def convert_batch(files, output_dir=None, options=None, jobs=1, max_in_flight=None,
+                  cancelled=None, manifest=None, stream_threshold=STREAM_THRESHOLD,
+                  split_jobs=1, pipeline_stats=None, site=None, file_timeout=None,
+                  memory_limit=None):
+    """Convert several files, yielding a ConversionResult per file
+
+    Batches run through a ConversionPipeline (see pipeline), which reads,
+    converts and writes different files at the same time; results are
+    yielded as they complete, not in input order.  With more than one job
+    the conversions run in a process pool.  At most max_in_flight files
+    (default: twice the worker count) wait between two stages, so huge
+    batches never hold every source in memory.  The optional cancelled
+    callable is polled between files; once it returns True no new files
+    are read.  Every path renders pages with the same code, so the output
+    is identical.  The stages' busy times and queue depths are stored in
+    the optional pipeline_stats dict.
+
+    With a SiteMap (see prepare_site()) pages mirror the source tree and
+    links between them are rewritten; worker processes receive it once.
+
+    When a BuildManifest is given, files it reports as up to date are
+    yielded as skipped results without being converted, and every
+    successful conversion is recorded in it.  Saving it is up to the caller.
+
+    Files of at least stream_threshold bytes are converted with bounded
+    memory by convert_readme_streaming(); pass None to never stream.
+
+    split_jobs (0 for one per CPU) is the number of worker processes a
+    single large file is split across; it applies per file, on top of jobs.
+
+    file_timeout (seconds) and memory_limit (bytes) bound every file of a
+    batch: conversions run in isolated workers, and a file that exceeds a
+    limit is retried once in a fresh worker, then yielded as failed.  A
+    single file is converted in this process, without limits.
+    """
+    cancelled = cancelled or (lambda: False)
+    jobs = resolve_jobs(jobs)
+    split_jobs = resolve_jobs(split_jobs)
+    entries = {}
+    if output_dir and options and options.get('external_assets'):
+        # Pages skipped as up to date still link to these
+        ensure_shared_assets(output_dir, options.get('minify'))
+
+    def work(files):
+        for file in files:
+            if manifest is not None:
+                try:
+                    fresh, entry = manifest.check(file)
+                except OSError as e:
+                    yield None, ConversionResult(file, error=str(e))
+                    continue
+                if fresh:
+                    yield None, ConversionResult(file, output=entry['output'], skipped=True)
+                    continue
+                entries[file] = entry
+            yield (file, output_dir, options, stream_threshold, split_jobs), None
+
+    def finish(result):
+        entry = entries.pop(result.source, None)
+        if entry is not None:
+            if result.error:
+                manifest.forget(result.source)
+            else:
+                manifest.record(result.source, entry, result.output,
+                                result.stats.get('dependencies'))
+        return result
+
+    files = iter(files)
+    head = list(islice(files, 2))
+    previous_site = site_map.active()
+    if site is not None:
+        site_map.activate(site)
+    try:
+        if len(head) < 2:
+            # Nothing to overlap for one file; skip the pipeline and its imports
+            for args, result in work(head):
+                if cancelled():
+                    return
+                yield result or finish(_convert_one(args))
+            return
+
+        from pipeline import ConversionPipeline
+
+        pipeline = ConversionPipeline(output_dir, options, jobs, max_in_flight,
+                                      stream_threshold, split_jobs, cancelled, site=site,
+                                      file_timeout=file_timeout, memory_limit=memory_limit)
+        items = (result or args[0] for args, result in work(chain(head, files)))
+        try:
+            for result in pipeline.run(items):
+                yield finish(result)
+        finally:
+            if pipeline_stats is not None:
+                pipeline_stats.update(pipeline.summary())
+    finally:
+        site_map.activate(previous_site)
+
+
+def watch(files, options=None, port=0):
+    """Preview files in the browser, re-rendering them as they change"""
+    import webbrowser
+    from preview_server import PreviewServer
+
+    server = PreviewServer(options, port=port).start()
+    urls = [server.add(file) for file in files]
+    for file, url in zip(files, urls):
+        print(f"{file} -> {url}")
+    webbrowser.open(urls[0] if len(urls) == 1 else server.base_url)
+
+    print("Watching for changes, press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='readme_engine',
+        description='Convert Markdown README files to styled HTML.'
+    )
+    parser.add_argument(
+        'files', nargs='+',
+        help='Markdown files to convert, or folders to search recursively'
+    )
+    parser.add_argument(
+        '--include', action='append', metavar='GLOB',
+        help='file pattern to convert in folders, repeatable '
+             '(default: *.md and *.markdown)'
+    )
+    parser.add_argument(
+        '--exclude', action='append', metavar='GLOB',
+        help='file or folder pattern to skip in folders, repeatable '
+             '(default: .git and node_modules)'
+    )
+    parser.add_argument(
+        '--no-gitignore', action='store_true',
+        help='also convert files that .gitignore files exclude'
+    )
+    parser.add_argument(
+        '-o', '--out', default='.',
+        help='output directory (default: current directory)'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='number of worker processes, 0 for one per CPU (default: 1)'
+    )
+    parser.add_argument(
+        '--max-in-flight', type=int, default=0,
+        help='files submitted to the pool at once (default: twice --jobs)'
+    )
+    parser.add_argument(
+        '-f', '--force', action='store_true',
+        help='convert every file, even if the build manifest says it is up to date'
+    )
+    parser.add_argument(
+        '--external-assets', action='store_true', default=None,
+        help='link one shared stylesheet and script instead of inlining them'
+    )
+    parser.add_argument(
+        '--site', action='store_true', default=None,
+        help='mirror the source folders into the output directory and '
+             'link pages to each other instead of to Markdown files'
+    )
+    parser.add_argument(
+        '--search', action='store_true', default=None,
+        help='build a client-side search index and add a search box to every page'
+    )
+    parser.add_argument(
+        '--minify', action='store_true', default=None,
+        help='minify the HTML, stylesheet and script of every page; '
+             '<pre> blocks are kept exactly'
+    )
+    parser.add_argument(
+        '--precompress', action='append', choices=sorted(FORMATS), metavar='FORMAT',
+        help='also write compressed copies of every page for static hosting: '
+             'gzip (.html.gz) or br (.html.br, needs the brotli package); repeatable'
+    )
+    parser.add_argument(
+        '--gzip-level', type=int, choices=range(1, 10), metavar='1-9',
+        help=f'gzip compression level (default: {GZIP_LEVEL})'
+    )
+    parser.add_argument(
+        '--brotli-quality', type=int, choices=range(0, 12), metavar='0-11',
+        help=f'Brotli compression quality (default: {BROTLI_QUALITY})'
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help='convert every file with the bounded-memory streaming path '
+             '(default: only files of 32 MB or more)'
+    )
+    parser.add_argument(
+        '--pdf', action='store_true', default=None,
+        help='also render every page to PDF with WeasyPrint'
+    )
+    parser.add_argument(
+        '--split-jobs', type=int, default=1,
+        help='worker processes a single large file is split across, '
+             '0 for one per CPU (default: 1, no splitting)'
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=FILE_TIMEOUT, metavar='SECONDS',
+        help='seconds one file may take before its worker is killed; it is '
+             'retried once, then reported as failed (default: 0, no limit)'
+    )
+    parser.add_argument(
+        '--memory-limit', type=int, default=0, metavar='MB',
+        help='address space (not resident memory) each worker may add to its '
+             'start-up size, enforced on Linux (default: no limit)'
+    )
+    parser.add_argument(
+        '-w', '--watch', action='store_true',
+        help='serve live-reloading previews instead of writing files'
+    )
+    parser.add_argument(
+        '--port', type=int, default=0,
+        help='port for --watch (default: any free port)'
+    )
+    parser.add_argument(
+        '--metrics', metavar='FILE',
+        help='write run metrics with per-file, per-stage spans as JSON'
+    )
+    parser.add_argument(
+        '--prometheus', metavar='FILE',
+        help='write run metrics in the Prometheus text-file format'
+    )
+    parser.add_argument(
+        '--profile', metavar='FILE',
+        help='capture a cProfile of the run (view with python -m pstats FILE)'
+    )
+    parser.add_argument(
+        '--preferences', default=PREFERENCES_PATH,
+        help='preferences file to read export options from '
+             '(default: the per-user preferences)'
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    prefs = load_preferences(args.preferences)
+    options = export_options(prefs)
+    if args.external_assets is not None:
+        options['external_assets'] = args.external_assets
+    if args.pdf is not None:
+        options['print'] = args.pdf
+    if args.site is not None:
+        options['site_mode'] = args.site
+    if args.search is not None:
+        options['search_index'] = args.search
+    if args.minify is not None:
+        options['minify'] = args.minify
+    if args.precompress:
+        options['precompress'] = sorted(set(args.precompress))
+    if args.gzip_level is not None:
+        options['gzip_level'] = args.gzip_level
+    if args.brotli_quality is not None:
+        options['brotli_quality'] = args.brotli_quality
+    folders = folder_options(prefs)
+    scanner = DirectoryScanner(
+        args.include or folders['include'],
+        args.exclude or folders['exclude'],
+        folders['gitignore'] and not args.no_gitignore
+    )
+    # Files found in folders are converted while the walk goes on
+    files = scanner.scan(args.files)
+    if args.watch:
+        return watch(list(files), options, args.port)
+    os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    renderer = None
+    pdf_failed = False
+    if options.get('print'):
+        from pdf_export import PdfRenderer, pdf_outdated, weasyprint_available
+        if weasyprint_available():
+            # Workers warm up while the HTML is being converted
+            renderer = PdfRenderer(args.jobs)
+        else:
+            print("PDF export needs WeasyPrint and its system libraries", file=sys.stderr)
+            pdf_failed = True
+
+    compress_failed = False
+    if 'br' in options['precompress'] and not brotli_available():
+        print("Brotli output needs the brotli package", file=sys.stderr)
+        options['precompress'] = [fmt for fmt in options['precompress'] if fmt != 'br']
+        compress_failed = True
+
+    site = None
+    if options.get('site_mode'):
+        # Every page must be known before the first one is linked
+        files, site = prepare_site(files, args.out, options, roots=args.files)
+    manifest = BuildManifest(args.out, build_fingerprint(options), force=args.force)
+    metrics = RunMetrics()
+    results = []
+    pdf_futures = []
+    pipeline_stats = {}
+    search = SearchIndex(args.out) if options.get('search_index') else None
+    # Only this process is profiled; use --jobs 1 without limits to include
+    # the conversions
+    with profiled(args.profile):
+        try:
+            for result in convert_batch(files, args.out, options, args.jobs,
+                                        args.max_in_flight, manifest=manifest,
+                                        stream_threshold=0 if args.stream else STREAM_THRESHOLD,
+                                        split_jobs=args.split_jobs,
+                                        pipeline_stats=pipeline_stats, site=site,
+                                        file_timeout=args.timeout,
+                                        memory_limit=args.memory_limit * 1024 * 1024):
+                results.append(result)
+                metrics.add_result(result)
+                if search is not None:
+                    search.add_result(result)
+                if result.error:
+                    print(f"Error converting {result.source}: {result.error}", file=sys.stderr)
+                elif not result.skipped:
+                    print(f"{result.source} -> {result.output}")
+                if (renderer and not result.error
+                        and (not result.skipped or pdf_outdated(result.output))):
+                    pdf_futures.append(renderer.submit(result.output, options=options))
+
+            from concurrent.futures import as_completed
+
+            for future in as_completed(pdf_futures):
+                try:
+                    pdf = future.result()
+                except Exception as e:
+                    pdf_failed = True
+                    print(f"Error rendering PDF: {e}", file=sys.stderr)
+                    continue
+                if pdf.error:
+                    pdf_failed = True
+                    print(f"Error rendering {pdf.source} to PDF: {pdf.error}", file=sys.stderr)
+                else:
+                    print(f"{pdf.source} -> {pdf.output} ({pdf.seconds:.2f}s)")
+                metrics.add_span('pdf', time.time() - pdf.seconds, pdf.seconds, pdf.source)
+        finally:
+            manifest.save()
+            if renderer:
+                renderer.close()
+        if search is not None:
+            with metrics.span('search'):
+                search.prune()
+                search_summary = search.save()
+
+    elapsed = time.perf_counter() - start
+    for error in scanner.errors:
+        print(f"Could not scan {error}", file=sys.stderr)
+    metrics.finish()
+    metrics.manifest = manifest.summary()
+    metrics.pipeline = pipeline_stats
+    if args.metrics:
+        metrics.write_json(args.metrics)
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus)
+    failures = sum(1 for r in results if r.error)
+    converted = sum(1 for r in results if not r.error and not r.skipped)
+    reuse = summarize_markdown_reuse(results)
+    hits = manifest.summary()
+    print(f"Converted {converted}/{len(results)} files in {elapsed:.2f}s")
+    print(f"Incremental build: {hits['hits']} up to date, {hits['misses']} rebuilt")
+    highlight = summarize_highlight_cache(results)
+    print(f"Markdown instances: {reuse['constructed']} built, "
+          f"{reuse['reused']} constructions saved")
+    print(f"Highlight cache: {highlight['memory_hits']} memory hits, "
+          f"{highlight['disk_hits']} disk hits, {highlight['misses']} misses "
+          f"({highlight['hit_rate']:.0%} hit rate)")
+    if search is not None:
+        print(f"Search index: {search_summary['pages']} pages, {search_summary['terms']} terms, "
+              f"{search_summary['tokenized']} pages tokenized, "
+              f"{search_summary['shards_written']}/{search_summary['shards']} shards written")
+    if site is not None:
+        links = sum(r.stats.get('links', 0) for r in results)
+        print(f"Site: {len(site)} pages under {site.root}, {links} links rewritten")
+    minified = summarize_minify(results)
+    if minified['pages']:
+        print(f"Minified HTML: {minified['pages']} pages, {minified['before'] / 1024:.0f} KB -> "
+              f"{minified['after'] / 1024:.0f} KB")
+    for fmt, total in summarize_compression(results).items():
+        print(f"Precompressed ({fmt}): {total['pages']} pages, "
+              f"{total['html_bytes'] / 1024:.0f} KB -> {total['bytes'] / 1024:.0f} KB")
+    images = summarize_images(results)
+    if any(images.values()):
+        print(f"Images: {images['inlined']} inlined, {images['copied']} copied to "
+              f"assets/, {images['missing']} not found, {images['skipped']} skipped")
+    peaks = [r.stats['peak_rss'] for r in results if r.stats.get('peak_rss')]
+    if peaks:
+        print(f"Peak RSS: {max(peaks) / (1024 * 1024):.1f} MB")
+    if pipeline_stats:
+        print("Pipeline: " + ", ".join(
+            f"{stage} {values['busy_seconds']:.2f}s busy"
+            + (f" (queue max {values['queue_max']}, mean {values['queue_mean']:.1f})"
+               if stage != 'read' else "")
+            for stage, values in pipeline_stats.items()
+        ))
+        isolation = pipeline_stats['convert']
+        if isolation.get('retried') or isolation.get('timeouts') or isolation.get('crashes'):
+            print(f"Isolated workers: {isolation['timeouts']} timeouts, "
+                  f"{isolation['crashes']} crashes, {isolation['retried']} files retried")
+    summary = metrics.summary()
+    if summary['converted']:
+        latency = summary['latency']
+        print(f"Throughput: {summary['files_per_second']:.1f} files/s, "
+              f"{summary['bytes_per_second'] / 1024:.0f} KB/s; latency "
+              f"p50 {latency['p50'] * 1000:.0f}ms, p95 {latency['p95'] * 1000:.0f}ms, "
+              f"p99 {latency['p99'] * 1000:.0f}ms")
+    return 1 if failures or pdf_failed or compress_failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1176 @@
+"""Tk user interface of README HTML Generator.
+
+Imported only when the GUI is started, so command line runs never pay for
+tkinter, tkinterdnd2 or gettext.  Conversion work is delegated to
+readme_engine.
+"""
+import os
+from pathlib import Path
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+from tkinterdnd2 import DND_FILES, TkinterDnD
+from tkinter.ttk import Progressbar
+import queue
+import threading
+import time
+from tkinter import colorchooser
+import gettext
+import readme_engine
+import file_list
+from file_scanner import DirectoryScanner
+from build_manifest import BuildManifest
+from metrics import RunMetrics, profiled
+from preferences_store import PreferencesStore
+
+# Set up translation
+localedir = Path(__file__).parent / 'locales'
+gettext.bindtextdomain('messages', localedir)
+gettext.textdomain('messages')
+_ = gettext.gettext
+
+# Conversion progress is redrawn at most this often (about 30 frames per second)
+PROGRESS_INTERVAL_MS = 33
+# Errors listed in one dialog before the rest are summarized
+MAX_ERRORS_SHOWN = 10
+# Rows scrolled per mouse wheel notch in the file list
+WHEEL_ROWS = 3
+
+# Modern dark theme color scheme
+COLORS = {
+    'primary': '#2b3d4f',
+    'primary_light': '#3d5a7a',
+    'primary_dark': '#1a2530',
+    'secondary': '#00b4d8',
+    'secondary_light': '#48cae4',
+    'accent': '#00e5ff',
+    'background': '#1a1a1a',
+    'surface': '#2d2d2d',
+    'text': '#e0e0e0',  
+    'text_light': '#b0b0b0', 
+    'border': '#404040',
+    'success': '#2dd4bf',
+    'warning': '#fbbf24',
+    'error': '#ef4444' 
+}
+
+class ModernUI:
+    """Utility class with modern UI styling methods"""
+    @staticmethod
+    def configure_styles():
+        style = ttk.Style()
+        
+        # Frame styling - dark
+        style.configure('TFrame', background=COLORS['background'])
+        style.configure('Surface.TFrame', background=COLORS['surface'])
+        
+        # Button styling - dark modern look
+        style.configure('TButton', 
+                      background=COLORS['primary'],
+                      foreground=COLORS['text'],
+                      padding=(15, 8),
+                      font=('Segoe UI', 10),
+                      borderwidth=0)
+        style.map('TButton',
+                background=[('active', COLORS['primary_light']), 
+                           ('pressed', COLORS['primary_dark'])])
+        
+        # Primary button with bright accent
+        style.configure('Primary.TButton', 
+                      background=COLORS['secondary'],
+                      foreground=COLORS['text'])
+        style.map('Primary.TButton',
+                background=[('active', COLORS['secondary_light']),
+                           ('pressed', COLORS['secondary'])])
+        
+        # Accent button
+        style.configure('Accent.TButton', 
+                      background=COLORS['accent'],
+                      foreground=COLORS['primary_dark'])
+        
+        # Label styling - light text on dark
+        style.configure('TLabel', 
+                      background=COLORS['background'],
+                      foreground=COLORS['text'],
+                      font=('Segoe UI', 10))
+        
+        # Header label with accent color
+        style.configure('Header.TLabel', 
+                      font=('Segoe UI', 24, 'bold'),
+                      foreground=COLORS['secondary'])
+        
+        # Subheader label
+        style.configure('Subheader.TLabel', 
+                      font=('Segoe UI', 14),
+                      foreground=COLORS['text_light'])
+        
+        # Entry styling for dark theme
+        style.configure('TEntry', 
+                      background=COLORS['surface'],
+                      foreground=COLORS['text'],
+                      fieldbackground=COLORS['surface'],
+                      insertcolor=COLORS['text'],
+                      padding=8,
+                      font=('Segoe UI', 10))
+        
+        # Checkbutton with light text
+        style.configure('TCheckbutton', 
+                      background=COLORS['background'],
+                      foreground=COLORS['text'],
+                      font=('Segoe UI', 10))
+        
+        # Progressbar with bright accent
+        style.configure('TProgressbar', 
+                      background=COLORS['secondary'],
+                      troughcolor=COLORS['surface'])
+                      
+        # Custom dropdown styling for dark theme
+        style.configure('Dropdown.TMenubutton',
+                     background=COLORS['surface'],
+                     foreground=COLORS['text'],
+                     padding=(10, 5),
+                     font=('Segoe UI', 10))
+        style.map('Dropdown.TMenubutton',
+                background=[('active', COLORS['primary_light']),
+                           ('pressed', COLORS['primary'])])
+
+    @staticmethod
+    def create_custom_button(parent, text, command, **kwargs):
+        """Create a modern custom button with hover effects"""
+        frame = tk.Frame(parent, background=COLORS['background'])
+        
+        btn = tk.Button(frame, text=text, command=command,
+                     font=('Segoe UI', 10),
+                     bg=COLORS['secondary'],
+                     fg='white',
+                     activebackground=COLORS['secondary_light'],
+                     activeforeground='white',
+                     bd=0,
+                     padx=15,
+                     pady=8,
+                     cursor='hand2',
+                     relief='flat',
+                     **kwargs)
+        
+        def on_enter(e):
+            btn['background'] = COLORS['secondary_light']
+            
+        def on_leave(e):
+            btn['background'] = COLORS['secondary']
+            
+        btn.bind('<Enter>', on_enter)
+        btn.bind('<Leave>', on_leave)
+        btn.pack(padx=1, pady=1)
+        
+        return frame
+
+class ExportSettingsDialog(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        
+        self.metadata = {
+            'author': tk.StringVar(master=self),
+            'description': tk.StringVar(master=self),
+            'keywords': tk.StringVar(master=self),
+        }
+        
+        self.title(_("Export Settings"))
+        self.geometry("500x400")
+        
+        # Create notebook for tabs
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        # Filename pattern tab
+        filename_frame = ttk.Frame(notebook)
+        notebook.add(filename_frame, text=_('Filename'))
+        
+        ttk.Label(filename_frame, text=_("Filename Pattern:")).pack(anchor='w', pady=5)
+        self.pattern_var = tk.StringVar(master=self, value="{name}")
+        pattern_entry = ttk.Entry(filename_frame, textvariable=self.pattern_var, width=40)
+        pattern_entry.pack(fill='x', padx=5)
+
+class FileListView(ttk.Frame):
+    """Virtualized view of a FileList
+
+    Only the rows that fit in the window exist as Listbox items; scrolling
+    redraws them from the model, so a list of 100,000 files draws as fast
+    as one of twenty.  Selection is kept as model positions.
+    """
+
+    STATE_COLORS = {
+        file_list.PENDING: COLORS['text'],
+        file_list.DONE: COLORS['success'],
+        file_list.FAILED: COLORS['error'],
+        file_list.SKIPPED: COLORS['text_light'],
+    }
+
+    def __init__(self, parent, model):
+        super().__init__(parent)
+        self.model = model
+        self.top = 0
+        self.selected = set()
+        self._drawn = None
+
+        self.listbox = tk.Listbox(
+            self,
+            font=('Segoe UI', 10),
+            bg=COLORS['surface'],
+            fg=COLORS['text'],
+            selectbackground=COLORS['primary_light'],
+            selectforeground=COLORS['text'],
+            selectmode='extended',
+            activestyle='none',
+            exportselection=False,
+            relief='flat',
+            highlightthickness=0
+        )
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.on_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        self.listbox.pack(side='left', fill='both', expand=True)
+
+        self.listbox.bind('<Configure>', lambda e: self.refresh())
+        self.listbox.bind('<<ListboxSelect>>', self.on_select)
+        self.listbox.bind('<MouseWheel>', self.on_wheel)
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-WHEEL_ROWS))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(WHEEL_ROWS))
+        self.listbox.bind('<Prior>', lambda e: self.scroll(-self.rows()))
+        self.listbox.bind('<Next>', lambda e: self.scroll(self.rows()))
+
+    def rows(self):
+        """Number of rows that fit in the list box"""
+        bbox = self.listbox.bbox(0)
+        row_height = bbox[3] + 1 if bbox else 20
+        return max(1, self.listbox.winfo_height() // row_height)
+
+    def refresh(self, force=False):
+        """Redraw the visible rows if the model or scroll position changed"""
+        total = len(self.model)
+        rows = self.rows()
+        self.top = max(0, min(self.top, total - rows))
+        key = (self.model.version, self.top, rows)
+        if key == self._drawn and not force:
+            return
+        self._drawn = key
+
+        self.listbox.delete(0, tk.END)
+        end = min(total, self.top + rows)
+        for row, position in enumerate(range(self.top, end)):
+            path, state, error = self.model[position]
+            label = path if state == file_list.PENDING else f"{path}  ({_(state)})"
+            self.listbox.insert(tk.END, label)
+            self.listbox.itemconfig(row, fg=self.STATE_COLORS[state])
+            if position in self.selected:
+                self.listbox.selection_set(row)
+        if total:
+            self.scrollbar.set(self.top / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll(self, rows):
+        self.top += rows
+        self.refresh()
+        return 'break'
+
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbar command: 'moveto fraction' or 'scroll n units|pages'"""
+        if action == 'moveto':
+            self.top = int(float(amount) * len(self.model))
+            self.refresh()
+        elif action == 'scroll':
+            step = self.rows() if unit == 'pages' else 1
+            self.scroll(int(amount) * step)
+
+    def on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS single steps
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-notches * WHEEL_ROWS)
+
+    def on_select(self, event=None):
+        """Mirror the selection of the visible rows into model positions"""
+        visible = range(self.top, self.top + self.listbox.size())
+        self.selected.difference_update(visible)
+        self.selected.update(self.top + row for row in self.listbox.curselection())
+
+    def selected_positions(self):
+        return sorted(p for p in self.selected if p < len(self.model))
+
+    def remove_selected(self):
+        removed = self.model.remove(self.selected)
+        self.selected.clear()
+        self.refresh()
+        return removed
+
+    def clear(self):
+        self.model.clear()
+        self.selected.clear()
+        self.top = 0
+        self.refresh()
+
+
+class ReadmeConverter(TkinterDnD.Tk):
+    def __init__(self):
+        super().__init__()
+        
+        # Styles need a Tk root, so they are configured once the app exists
+        ModernUI.configure_styles()
+        
+        self.title(_("README HTML Generator"))
+        self.geometry("800x600")
+        self.configure(bg=COLORS['background'])
+        
+        # Initialize state variables
+        self.output_dir = None
+        self.preview_server = None
+        self.pdf_renderer = None
+        self.cancel_conversion = False
+        # Loaded once; changes are saved in the background
+        self.preferences = PreferencesStore(
+            readme_engine.PREFERENCES_PATH, readme_engine.DEFAULT_PREFERENCES
+        )
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.recent_files = [
+            file for file in self.preferences.get('recent_files', [])
+            if os.path.exists(file)
+        ]
+        self.max_recent_files = 5
+        
+        # Create main container
+        self.main_container = ttk.Frame(self, style='Surface.TFrame')
+        self.main_container.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        # Create header
+        header_label = ttk.Label(
+            self.main_container,
+            text=_("README HTML Generator"),
+            style='Header.TLabel'
+        )
+        header_label.pack(pady=(0, 20))
+        
+        # Create file list
+        self.files_frame = ttk.Frame(self.main_container)
+        self.files_frame.pack(fill='both', expand=True, pady=10)
+        
+        self.file_list = file_list.FileList()
+        self.file_view = FileListView(self.files_frame, self.file_list)
+        self.file_view.pack(fill='both', expand=True)
+        self.file_view.listbox.bind('<Delete>', lambda e: self.remove_selected_files())
+        self.file_view.listbox.bind('<Double-Button-1>', lambda e: self.preview_file())
+        
+        # Enable drag and drop
+        self.file_view.listbox.drop_target_register(DND_FILES)
+        self.file_view.listbox.dnd_bind('<<Drop>>', self.on_drop)
+        
+        # Create buttons frame
+        self.buttons_frame = ttk.Frame(self.main_container)
+        self.buttons_frame.pack(fill='x', pady=20)
+        
+        # Add buttons
+        browse_btn = ModernUI.create_custom_button(
+            self.buttons_frame,
+            _("Browse Files"),
+            self.browse_files
+        )
+        browse_btn.pack(side='left', padx=5)
+        
+        folder_btn = ModernUI.create_custom_button(
+            self.buttons_frame,
+            _("Add Folder"),
+            self.browse_folder
+        )
+        folder_btn.pack(side='left', padx=5)
+        
+        preview_btn = ModernUI.create_custom_button(
+            self.buttons_frame,
+            _("Preview"),
+            self.preview_file
+        )
+        preview_btn.pack(side='left', padx=5)
+        
+        convert_btn = ModernUI.create_custom_button(
+            self.buttons_frame,
+            _("Convert to HTML"),
+            self.convert_files
+        )
+        convert_btn.pack(side='left', padx=5)
+        
+        cancel_btn = ModernUI.create_custom_button(
+            self.buttons_frame,
+            _("Cancel"),
+            self.cancel_conversion_task
+        )
+        cancel_btn.pack(side='left', padx=5)
+        
+        # Progress bar
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ttk.Progressbar(
+            self.main_container,
+            variable=self.progress_var,
+            maximum=100,
+            mode='determinate',
+            style='TProgressbar'
+        )
+        self.progress_bar.pack(fill='x', pady=10)
+        
+        # Status label
+        self.status_label = ttk.Label(
+            self.main_container,
+            text="",
+            style='TLabel'
+        )
+        self.status_label.pack(pady=5)
+        
+        # Create menu
+        self.create_menu()
+        
+    def create_menu(self):
+        """Create the main menu bar"""
+        self.menu_bar = tk.Menu(self, bg=COLORS['surface'], fg=COLORS['text'])
+        self.config(menu=self.menu_bar)
+        
+        # File menu
+        self.file_menu = tk.Menu(
+            self.menu_bar,
+            tearoff=0,
+            bg=COLORS['surface'],
+            fg=COLORS['text'],
+            activebackground=COLORS['primary_light'],
+            activeforeground=COLORS['text']
+        )
+        self.menu_bar.add_cascade(label=_("File"), menu=self.file_menu)
+        self.file_menu.add_command(label=_("Open..."), command=self.browse_files)
+        self.file_menu.add_command(label=_("Add Folder..."), command=self.browse_folder)
+        self.file_menu.add_command(label=_("Preview..."), command=self.preview_file)
+        self.file_menu.add_command(label=_("Remove Selected"), command=self.remove_selected_files)
+        self.file_menu.add_command(label=_("Clear List"), command=self.file_view.clear)
+        self.file_menu.add_command(label=_("Export Settings..."), command=self.show_export_settings)
+        self.file_menu.add_separator()
+        
+        # Recent files submenu
+        self.recent_menu = tk.Menu(
+            self.file_menu,
+            tearoff=0,
+            bg=COLORS['surface'],
+            fg=COLORS['text'],
+            activebackground=COLORS['primary_light'],
+            activeforeground=COLORS['text']
+        )
+        self.file_menu.add_cascade(label=_("Recent Files"), menu=self.recent_menu)
+        self.update_recent_menu()
+        
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label=_("Exit"), command=self.quit)
+        
+        # Options menu
+        options_menu = tk.Menu(
+            self.menu_bar,
+            tearoff=0,
+            bg=COLORS['surface'],
+            fg=COLORS['text'],
+            activebackground=COLORS['primary_light'],
+            activeforeground=COLORS['text']
+        )
+        self.menu_bar.add_cascade(label=_("Options"), menu=options_menu)
+        options_menu.add_command(label=_("Export Options..."), command=self.show_export_options)
+        options_menu.add_command(label=_("Theme Settings..."), command=self.show_theme_settings)
+    
+    def load_preferences(self):
+        """Return a copy of the in-memory user preferences"""
+        return self.preferences.snapshot()
+    
+    def save_preferences(self, prefs):
+        """Replace the user preferences; they are written shortly after"""
+        self.preferences.replace(prefs)
+    
+    def on_close(self):
+        """Write pending preferences before the window goes away"""
+        self.preferences.flush()
+        self.destroy()
+    
+    def browse_files(self):
+        """Open file browser dialog"""
+        files = filedialog.askopenfilenames(
+            title=_("Select README files"),
+            filetypes=[
+                ("Markdown files", "*.md"),
+                ("All files", "*.*")
+            ]
+        )
+        if files:
+            self.add_files(files)
+    
+    def browse_folder(self):
+        """Add the Markdown files of a folder and its subfolders"""
+        folder = filedialog.askdirectory(title=_("Select a folder to search"))
+        if folder:
+            self.scan_folders([folder])
+    
+    def scan_folders(self, folders):
+        """Search folders in the background, adding files as they are found"""
+        settings = readme_engine.folder_options(self.load_preferences())
+        scanner = DirectoryScanner(
+            settings['include'], settings['exclude'], settings['gitignore']
+        )
+        found = queue.Queue()
+        counts = {'added': 0, 'listed': 0}
+        
+        def scan_task():
+            try:
+                for path in scanner.scan(folders):
+                    found.put(path)
+            except Exception as e:
+                scanner.errors.append(str(e))
+            finally:
+                found.put(None)
+        
+        def drain_found():
+            batch = []
+            done = False
+            while True:
+                try:
+                    path = found.get_nowait()
+                except queue.Empty:
+                    break
+                if path is None:
+                    done = True
+                    break
+                batch.append(path)
+            if batch:
+                counts['added'] += len(self.file_list.add(batch))
+                counts['listed'] += len(batch)
+                self.file_view.refresh()
+            if not done:
+                self.status_label.config(
+                    text=_("Searching folders... {} files found").format(counts['listed'])
+                )
+                self.after(PROGRESS_INTERVAL_MS, drain_found)
+                return
+            self.status_label.config(
+                text=_("Added {} files ({} already listed) from {} folders").format(
+                    counts['added'], counts['listed'] - counts['added'], scanner.directories
+                )
+            )
+            if scanner.errors:
+                errors = scanner.errors[:MAX_ERRORS_SHOWN]
+                messagebox.showwarning(
+                    _("Folder Search"),
+                    _("Some folders could not be read:") + "\n" + "\n".join(errors)
+                )
+        
+        threading.Thread(target=scan_task, daemon=True).start()
+        self.after(PROGRESS_INTERVAL_MS, drain_found)
+    
+    def add_files(self, files):
+        """Add files to the list, skipping ones already listed"""
+        files = list(files)
+        added = self.file_list.add(files)
+        self.file_view.refresh()
+        self.status_label.config(
+            text=_("Added {} files ({} already listed)").format(
+                len(added), len(files) - len(added)
+            )
+        )
+        
+        # Add to recent files
+        self.add_to_recent_files(added)
+    
+    def remove_selected_files(self):
+        """Remove the selected files from the list"""
+        removed = self.file_view.remove_selected()
+        if removed:
+            self.status_label.config(text=_("Removed {} files").format(removed))
+    
+    def on_drop(self, event):
+        """Handle drag and drop events"""
+        paths = self.tk.splitlist(event.data)
+        folders = [path for path in paths if os.path.isdir(path)]
+        files = [path for path in paths if not os.path.isdir(path)]
+        if files:
+            self.add_files(files)
+        if folders:
+            self.scan_folders(folders)
+    
+    def convert_files(self):
+        """Convert all files in the list"""
+        import pdf_export
+
+        files = self.file_list.paths()
+        if not files:
+            messagebox.showwarning(
+                _("No Files"),
+                _("Please add some README files to convert.")
+            )
+            return
+        
+        # Ask for output directory
+        output_dir = filedialog.askdirectory(
+            title=_("Select Output Directory")
+        )
+        if not output_dir:
+            return
+            
+        self.output_dir = output_dir
+        total_files = len(files)
+        self.file_list.reset_states()
+        self.file_view.refresh()
+        prefs = self.load_preferences()
+        options = readme_engine.export_options(prefs)
+        conversion = dict(
+            readme_engine.DEFAULT_PREFERENCES['conversion'],
+            **prefs.get('conversion', {})
+        )
+        
+        metrics = RunMetrics()
+        metrics.pipeline = {}
+        metrics_dir = conversion['metrics_dir']
+        # The worker only posts to this queue; the Tk thread drains it
+        updates = queue.Queue()
+
+        def drain_updates():
+            """Apply everything the worker posted since the last frame"""
+            with metrics.span('gui'):
+                progress = None
+                errors = []
+                done = False
+                while True:
+                    try:
+                        kind, value = updates.get_nowait()
+                    except queue.Empty:
+                        break
+                    if kind == 'progress':
+                        # Only the newest position is worth drawing
+                        progress = value
+                    elif kind == 'state':
+                        self.file_list.set_state(*value)
+                    elif kind == 'error':
+                        errors.append(value)
+                    elif kind == 'done':
+                        done = True
+
+                if progress is not None:
+                    i, filename = progress
+                    self.progress_var.set((i / total_files) * 100)
+                    self.status_label.config(
+                        text=_("Converting: {} ({}/{})").format(
+                            filename, i, total_files
+                        )
+                    )
+                # Redraws only if a visible row changed state
+                self.file_view.refresh()
+                if errors:
+                    show_errors(errors)
+            if done:
+                finish_conversion()
+            else:
+                self.after(PROGRESS_INTERVAL_MS, drain_updates)
+
+        def show_errors(errors):
+            message = "\n".join(errors[:MAX_ERRORS_SHOWN])
+            if len(errors) > MAX_ERRORS_SHOWN:
+                message += "\n" + _("...and {} more").format(len(errors) - MAX_ERRORS_SHOWN)
+            messagebox.showerror(_("Error"), message)
+
+        def finish_conversion():
+            cancelled = self.cancel_conversion
+            self.progress_var.set(0)
+            self.cancel_conversion = False
+            if cancelled:
+                self.status_label.config(
+                    text=_("Conversion cancelled. {} up to date, {} rebuilt").format(
+                        manifest.hits, manifest.misses
+                    )
+                )
+                return
+
+            self.status_label.config(
+                text=_("Conversion complete! {} up to date, {} rebuilt").format(
+                    manifest.hits, manifest.misses
+                )
+            )
+
+            # Ask to open output directory
+            if messagebox.askyesno(
+                _("Complete"),
+                _("Conversion complete! Would you like to open the output directory?")
+            ):
+                self.open_output_dir()
+
+        if 'br' in options['precompress'] and not readme_engine.brotli_available():
+            options['precompress'] = [fmt for fmt in options['precompress'] if fmt != 'br']
+            messagebox.showwarning(
+                _("Compression"),
+                _("Brotli output needs the brotli package; only .gz copies will be written.")
+            )
+
+        site = None
+        if options.get('site_mode'):
+            files, site = readme_engine.prepare_site(files, self.output_dir, options)
+        manifest = BuildManifest(self.output_dir, readme_engine.build_fingerprint(options))
+        search = None
+        if options.get('search_index'):
+            search = readme_engine.SearchIndex(self.output_dir)
+
+        renderer = None
+        if options.get('print'):
+            if self.pdf_renderer is None and pdf_export.weasyprint_available():
+                # Kept for the lifetime of the app so later exports start warm
+                self.pdf_renderer = pdf_export.PdfRenderer(conversion['jobs'])
+            renderer = self.pdf_renderer
+            if renderer is None:
+                messagebox.showwarning(
+                    _("PDF Export"),
+                    _("PDF export needs WeasyPrint; only HTML will be written.")
+                )
+
+        def conversion_task():
+            profile_path = None
+            if metrics_dir and conversion['profile']:
+                profile_path = Path(metrics_dir) / 'profile.prof'
+            try:
+                with profiled(profile_path):
+                    convert_all()
+                metrics.finish()
+                metrics.manifest = manifest.summary()
+                if metrics_dir:
+                    os.makedirs(metrics_dir, exist_ok=True)
+                    metrics.write_json(Path(metrics_dir) / 'metrics.json')
+                    metrics.write_prometheus(Path(metrics_dir) / 'metrics.prom')
+            except Exception as e:
+                updates.put(('error', str(e)))
+            finally:
+                updates.put(('done', None))
+
+        def convert_all():
+            # Results stream back from the worker pool as files complete
+            results = readme_engine.convert_batch(
+                files,
+                self.output_dir,
+                options,
+                jobs=conversion['jobs'],
+                max_in_flight=conversion['max_in_flight'],
+                split_jobs=conversion['split_jobs'],
+                file_timeout=conversion['file_timeout'],
+                memory_limit=conversion['memory_limit_mb'] * 1024 * 1024,
+                cancelled=lambda: self.cancel_conversion,
+                manifest=manifest,
+                pipeline_stats=metrics.pipeline,
+                site=site
+            )
+            pdf_futures = []
+            for i, result in enumerate(results, 1):
+                metrics.add_result(result)
+                if search is not None:
+                    search.add_result(result)
+                if result.error:
+                    state = file_list.FAILED
+                elif result.skipped:
+                    state = file_list.SKIPPED
+                else:
+                    state = file_list.DONE
+                updates.put(('state', (result.source, state, result.error)))
+                updates.put(('progress', (i, Path(result.source).name)))
+                if result.error:
+                    updates.put(('error', _("Error converting {}: {}").format(
+                        result.source, result.error
+                    )))
+                elif renderer and (not result.skipped or pdf_export.pdf_outdated(result.output)):
+                    pdf_futures.append(renderer.submit(result.output, options=options))
+            
+            manifest.save()
+            if search is not None:
+                with metrics.span('search'):
+                    search.prune()
+                    search.save()
+
+            for future in pdf_futures:
+                try:
+                    pdf = future.result()
+                    error = pdf.error
+                    metrics.add_span('pdf', time.time() - pdf.seconds, pdf.seconds, pdf.source)
+                except Exception as e:
+                    pdf, error = None, str(e)
+                if error:
+                    updates.put(('error', _("Error rendering {} to PDF: {}").format(
+                        pdf.source if pdf else "", error
+                    )))
+
+        # Run conversion in background thread
+        self.cancel_conversion = False
+        threading.Thread(target=conversion_task, daemon=True).start()
+        self.after(PROGRESS_INTERVAL_MS, drain_updates)
+    
+    def cancel_conversion_task(self):
+        """Stop starting new files in the running conversion"""
+        self.cancel_conversion = True
+        self.status_label.config(text=_("Cancelling..."))
+    
+    def show_export_options(self):
+        """Show export options dialog"""
+        dialog = ExportOptionsDialog(self)
+        dialog.grab_set()
+        dialog.wait_window()
+    
+    def show_export_settings(self):
+        """Show export settings dialog"""
+        dialog = ExportSettingsDialog(self)
+        dialog.grab_set()
+        dialog.wait_window()
+    
+    def show_theme_settings(self):
+        """Show theme settings dialog"""
+        dialog = ThemeSettingsDialog(self)
+        dialog.grab_set()
+        dialog.wait_window()
+    
+    def open_output_dir(self):
+        """Open the output directory in file explorer"""
+        if self.output_dir:
+            os.startfile(os.path.realpath(self.output_dir))
+    
+    def update_recent_menu(self):
+        """Update the recent files menu"""
+        self.recent_menu.delete(0, tk.END)
+        
+        if not self.recent_files:
+            self.recent_menu.add_command(
+                label=_("No recent files"),
+                state="disabled"
+            )
+            return
+        
+        for file in self.recent_files:
+            self.recent_menu.add_command(
+                label=file,
+                command=lambda f=file: self.open_recent_file(f)
+            )
+    
+    def add_to_recent_files(self, files):
+        """Add files to recent files list"""
+        recent = list(self.recent_files)
+        
+        # Only the last few files can end up in the list
+        for file in list(files)[-self.max_recent_files:]:
+            if file in recent:
+                recent.remove(file)
+            recent.insert(0, file)
+        
+        # Keep only max_recent_files
+        recent = recent[:self.max_recent_files]
+        
+        self.preferences.set('recent_files', recent)
+        self.recent_files = recent
+        self.update_recent_menu()
+    
+    def open_recent_file(self, file):
+        """Open a recent file"""
+        if os.path.exists(file):
+            self.file_view.clear()
+            self.file_list.add([file])
+            self.file_view.refresh()
+        else:
+            messagebox.showerror(
+                _("Error"),
+                _("File not found: {}").format(file)
+            )
+            # Remove from recent files
+            self.recent_files.remove(file)
+            self.preferences.set('recent_files', self.recent_files)
+            self.update_recent_menu()
+    
+    def preview_file(self):
+        """Preview the selected files (or the first one) with live reload"""
+        positions = self.file_view.selected_positions() or [0]
+        files = [self.file_list[p][0] for p in positions if p < len(self.file_list)]
+        if not files:
+            messagebox.showwarning(_("No File"), _("Please select a file to preview."))
+            return
+        
+        import webbrowser
+        from preview_server import PreviewServer
+
+        options = readme_engine.export_options(self.load_preferences())
+        if self.preview_server is None:
+            # One server per app; it keeps watching every file added to it
+            self.preview_server = PreviewServer(options).start()
+        self.preview_server.options = options
+        
+        urls = [self.preview_server.add(file) for file in files]
+        
+        # Open in browser
+        webbrowser.open(urls[0] if len(urls) == 1 else self.preview_server.base_url)
+
+class ExportOptionsDialog(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        
+        self.title(_("Export Options"))
+        self.geometry("350x510")
+        self.configure(bg=COLORS['background'])
+        
+        # Initialize variables after parent initialization
+        self.parent = parent
+        options = readme_engine.export_options(parent.load_preferences())
+        self.mobile_var = tk.BooleanVar(master=self, value=options['mobile'])
+        self.print_var = tk.BooleanVar(master=self, value=options['print'])
+        self.toc_var = tk.BooleanVar(master=self, value=options['toc'])
+        self.site_var = tk.BooleanVar(master=self, value=options['site_mode'])
+        self.search_var = tk.BooleanVar(master=self, value=options['search_index'])
+        self.minify_var = tk.BooleanVar(master=self, value=options['minify'])
+        self.precompress = options['precompress']
+        self.precompress_var = tk.BooleanVar(master=self, value=bool(self.precompress))
+        
+        # Create options frame
+        options_frame = ttk.Frame(self, style='Surface.TFrame')
+        options_frame.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        # Add options with dark theme
+        checkbutton_style = {'style': 'TCheckbutton'}
+        ttk.Checkbutton(
+            options_frame,
+            text=_("Mobile-friendly layout"),
+            variable=self.mobile_var,
+            **checkbutton_style
+        ).pack(anchor='w', pady=5)
+        
+        ttk.Checkbutton(
+            options_frame,
+            text=_("Print-friendly version (also export PDF)"),
+            variable=self.print_var,
+            **checkbutton_style
+        ).pack(anchor='w', pady=5)
+        
+        ttk.Checkbutton(
+            options_frame,
+            text=_("Include table of contents"),
+            variable=self.toc_var,
+            **checkbutton_style
+        ).pack(anchor='w', pady=5)
+        
+        ttk.Checkbutton(
+            options_frame,
+            text=_("Site mode (mirror folders, link pages)"),
+            variable=self.site_var,
+            **checkbutton_style
+        ).pack(anchor='w', pady=5)
+        
+        ttk.Checkbutton(
+            options_frame,
+            text=_("Search box and index"),
+            variable=self.search_var,
+            **checkbutton_style
+        ).pack(anchor='w', pady=5)
+        
+        ttk.Checkbutton(
+            options_frame,
+            text=_("Minify HTML, CSS and JavaScript"),
+            variable=self.minify_var,
+            **checkbutton_style
+        ).pack(anchor='w', pady=5)
+        
+        ttk.Checkbutton(
+            options_frame,
+            text=_("Pre-compressed copies for static hosting"),
+            variable=self.precompress_var,
+            **checkbutton_style
+        ).pack(anchor='w', pady=5)
+        
+        # Add options description with dark theme
+        desc_text = tk.Text(
+            options_frame,
+            height=6,
+            wrap='word',
+            font=('Segoe UI', 9),
+            bg=COLORS['surface'],
+            fg=COLORS['text_light'],
+            insertbackground=COLORS['text']  # Cursor color
+        )
+        desc_text.pack(fill='both', expand=True, pady=10)
+        desc_text.insert('1.0', _("""Mobile-friendly: Optimizes layout for mobile devices
+Print-friendly: Also renders each page to PDF with print styles
+Table of contents: Automatically generates navigation
+Site mode: Keeps the folder structure and turns links to other listed Markdown files into links to their pages
+Search: Writes a search index next to the pages and adds a search box to them
+Minify: Strips comments and whitespace from pages; code blocks are kept exactly
+Pre-compressed: Also writes a .html.gz copy of every page for servers that serve them directly
+"""))
+        desc_text.configure(state='disabled')
+        
+        # Buttons with dark theme
+        button_frame = ttk.Frame(self, style='Surface.TFrame')
+        button_frame.pack(fill='x', padx=20, pady=(0, 20))
+        
+        ttk.Button(
+            button_frame,
+            text=_("Save"),
+            command=self.save_and_close,
+            style='Primary.TButton'
+        ).pack(side='right', padx=5)
+        
+        ttk.Button(
+            button_frame,
+            text=_("Cancel"),
+            command=self.destroy
+        ).pack(side='right')
+    
+    def save_and_close(self):
+        """Save options and close dialog"""
+        self.result = {
+            'mobile': self.mobile_var.get(),
+            'print': self.print_var.get(),
+            'toc': self.toc_var.get(),
+            'site_mode': self.site_var.get(),
+            'search_index': self.search_var.get(),
+            'minify': self.minify_var.get(),
+            # Keep formats chosen in preferences.json, such as Brotli
+            'precompress': (self.precompress or ['gzip']) if self.precompress_var.get() else []
+        }
+        self.parent.preferences.update_section('export_options', self.result)
+        self.destroy()
+
+class ThemeSettingsDialog(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        
+        self.title(_("Theme Settings"))
+        self.geometry("500x400")
+        self.configure(bg=COLORS['background'])
+        
+        # Create main frame with dark theme
+        main_frame = ttk.Frame(self, style='Surface.TFrame')
+        main_frame.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        # Theme selector with dark styling
+        ttk.Label(
+            main_frame,
+            text=_("Select Theme:"),
+            style='Header.TLabel'
+        ).pack(anchor='w', pady=(0, 10))
+        
+        themes = ['default', 'dark', 'light', 'custom']
+        self.theme_var = tk.StringVar(value='dark')  # Set dark as default
+        
+        for theme in themes:
+            rb = ttk.Radiobutton(
+                main_frame,
+                text=theme.capitalize(),
+                value=theme,
+                variable=self.theme_var,
+                command=self.on_theme_change,
+                style='TRadiobutton'
+            )
+            rb.pack(anchor='w', pady=2)
+        
+        # Custom colors section
+        ttk.Label(
+            main_frame,
+            text=_("Custom Colors:"),
+            style='Header.TLabel'
+        ).pack(anchor='w', pady=(20, 10))
+        
+        color_frame = ttk.Frame(main_frame, style='Surface.TFrame')
+        color_frame.pack(fill='x')
+        
+        self.color_buttons = {}
+        colors = {
+            'background': _("Background"),
+            'text': _("Text"),
+            'link': _("Links"),
+            'code': _("Code blocks")
+        }
+        
+        for color_key, color_name in colors.items():
+            btn = ttk.Button(
+                color_frame,
+                text=color_name,
+                command=lambda k=color_key: self.choose_color(k),
+                style='Dropdown.TMenubutton'  # Use dropdown style for better dark theme appearance
+            )
+            btn.pack(side='left', padx=5)
+            self.color_buttons[color_key] = btn
+        
+        # Preview section with dark theme
+        ttk.Label(
+            main_frame,
+            text=_("Preview:"),
+            style='Header.TLabel'
+        ).pack(anchor='w', pady=(20, 10))
+        
+        self.preview = tk.Text(
+            main_frame,
+            height=8,
+            width=40,
+            font=('Segoe UI', 10),
+            wrap='word',
+            bg=COLORS['surface'],
+            fg=COLORS['text'],
+            insertbackground=COLORS['text']
+        )
+        self.preview.pack(fill='both', expand=True)
+        self.preview.insert('1.0', _("Preview text with some **markdown** and `code`"))
+        
+        # Buttons with dark theme
+        button_frame = ttk.Frame(self, style='Surface.TFrame')
+        button_frame.pack(fill='x', padx=20, pady=(0, 20))
+        
+        ttk.Button(
+            button_frame,
+            text=_("Save"),
+            command=self.save_and_close,
+            style='Primary.TButton'
+        ).pack(side='right', padx=5)
+        
+        ttk.Button(
+            button_frame,
+            text=_("Cancel"),
+            command=self.destroy,
+            style='TButton'
+        ).pack(side='right')
+        
+        # Initialize with dark theme
+        self.on_theme_change()
+    
+    def on_theme_change(self):
+        """Handle theme change"""
+        theme = self.theme_var.get()
+        for btn in self.color_buttons.values():
+            btn.configure(state='normal' if theme == 'custom' else 'disabled')
+        self.update_preview()
+    
+    def choose_color(self, color_key):
+        """Open color chooser dialog"""
+        color = colorchooser.askcolor(title=_("Choose color"))
+        if color[1]:
+            self.color_buttons[color_key].configure(bg=color[1])
+            self.update_preview()
+    
+    def update_preview(self):
+        """Update preview text with current theme"""
+        theme = self.theme_var.get()
+        if theme == 'custom':
+            # Apply custom colors
+            bg = self.color_buttons['background'].cget('bg')
+            fg = self.color_buttons['text'].cget('bg')
+            self.preview.configure(bg=bg, fg=fg)
+        else:
+            # Apply predefined theme
+            self.preview.configure(
+                bg=COLORS['surface'],
+                fg=COLORS['text']
+            )
+    
+    def save_and_close(self):
+        """Save theme settings and close dialog"""
+        self.result = {
+            'theme': self.theme_var.get(),
+            'colors': {
+                k: btn.cget('bg')
+                for k, btn in self.color_buttons.items()
+            } if self.theme_var.get() == 'custom' else {}
+        }
+        self.destroy()
+
+def main():
+    app = ReadmeConverter()
+    app.mainloop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+// Search widget for pages converted by README HTML Generator.
+//
+// Loaded from search/search.js next to the index.  pages.json is fetched on
+// the first search; each term's shard (terms-<prefix>.json) only when a term
+// with that prefix is searched.  Tokenization matches search_index.py.
+(function () {
+    var base = new URL('.', document.currentScript.src);
+    var root = new URL('..', base);
+    var SHARD_PREFIX = 2;
+    var MIN_TERM_LENGTH = 2;
+    var MAX_RESULTS = 10;
+    var STOP_WORDS = new Set((
+        'a an and are as at be but by can do for from had has have how if in ' +
+        'into is it its not of on or our so than that the their them then ' +
+        'there these they this to was we were what when which who will with ' +
+        'you your'
+    ).split(' '));
+    var shards = {};
+    var pages = null;
+
+    function fetchJson(name) {
+        return fetch(new URL(name, base)).then(function (response) {
+            return response.ok ? response.json() : {};
+        }).catch(function () { return {}; });
+    }
+
+    function tokenize(text) {
+        return (text.toLowerCase().match(/[\p{L}\p{N}_]+/gu) || []).filter(function (term) {
+            return term.length >= MIN_TERM_LENGTH && !STOP_WORDS.has(term) && !/^\d+$/.test(term);
+        });
+    }
+
+    function shardName(term) {
+        return 'terms-' + Array.from(term).slice(0, SHARD_PREFIX).map(function (c) {
+            return /[a-z0-9]/.test(c) ? c : '_' + c.codePointAt(0).toString(16);
+        }).join('') + '.json';
+    }
+
+    function shard(term) {
+        var name = shardName(term);
+        if (!shards[name]) {
+            shards[name] = fetchJson(name);
+        }
+        return shards[name];
+    }
+
+    // Every term must match; the last one may be a prefix of a word
+    function search(query) {
+        var terms = tokenize(query);
+        if (!terms.length) {
+            return Promise.resolve([]);
+        }
+        if (!pages) {
+            pages = fetchJson('pages.json');
+        }
+        return Promise.all([pages].concat(terms.map(shard))).then(function (loaded) {
+            var pageList = loaded[0];
+            var scores = null;
+            terms.forEach(function (term, i) {
+                var index = loaded[i + 1];
+                var found = {};
+                Object.keys(index).forEach(function (key) {
+                    var matches = i === terms.length - 1 ? key.indexOf(term) === 0 : key === term;
+                    if (matches) {
+                        index[key].forEach(function (posting) {
+                            var id = posting[0] + ':' + posting[1];
+                            found[id] = (found[id] || 0) + posting[2];
+                        });
+                    }
+                });
+                if (scores === null) {
+                    scores = found;
+                } else {
+                    Object.keys(scores).forEach(function (id) {
+                        if (id in found) {
+                            scores[id] += found[id];
+                        } else {
+                            delete scores[id];
+                        }
+                    });
+                }
+            });
+            return Object.keys(scores).sort(function (a, b) {
+                return scores[b] - scores[a];
+            }).slice(0, MAX_RESULTS).map(function (id) {
+                var parts = id.split(':');
+                var page = pageList[parts[0]];
+                if (!page) {
+                    return null;
+                }
+                var section = page[2][parts[1]];
+                return {
+                    url: new URL(page[0] + (section[0] ? '#' + section[0] : ''), root).href,
+                    title: section[1] ? page[1] + ' › ' + section[1] : page[1],
+                    snippet: section[2]
+                };
+            }).filter(Boolean);
+        });
+    }
+
+    function render(box, results) {
+        var list = box.querySelector('.search-results');
+        list.textContent = '';
+        results.forEach(function (result) {
+            var item = document.createElement('li');
+            var link = document.createElement('a');
+            link.href = result.url;
+            link.textContent = result.title;
+            var snippet = document.createElement('p');
+            snippet.textContent = result.snippet;
+            item.appendChild(link);
+            item.appendChild(snippet);
+            list.appendChild(item);
+        });
+    }
+
+    function install() {
+        var style = document.createElement('style');
+        style.textContent = '.search-box{margin:0 0 1.5em}' +
+            '.search-box input{width:100%;padding:.5em;font:inherit;box-sizing:border-box}' +
+            '.search-results{list-style:none;padding:0;margin:.5em 0 0}' +
+            '.search-results li{margin:.5em 0}' +
+            '.search-results p{margin:.2em 0 0;font-size:.9em;opacity:.8}';
+        document.head.appendChild(style);
+
+        var box = document.createElement('div');
+        box.className = 'search-box';
+        box.innerHTML = '<input type="search" placeholder="Search" aria-label="Search">' +
+            '<ul class="search-results"></ul>';
+        var content = document.querySelector('.content') || document.body;
+        content.insertBefore(box, content.firstChild);
+
+        var input = box.querySelector('input');
+        var latest = 0;
+        input.addEventListener('input', function () {
+            var request = ++latest;
+            search(input.value).then(function (results) {
+                // Drop answers to queries the user has already typed past
+                if (request === latest) {
+                    render(box, results);
+                }
+            });
+        });
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', install);
+    } else {
+        install();
+    }
+})();
@@ -0,0 +1,267 @@
+"""Client-side search index for converted pages.
+
+While a page is rendered, its body is split at the headings the TOC
+extension gave ids to, and the terms of every section are counted
+(SectionCollector).  After a batch, SearchIndex merges those sections into
+``search/`` next to the pages:
+
+* ``pages.json``: per page its URL, title and the anchor, heading and
+  snippet of every section, loaded once by the widget;
+* ``terms-<prefix>.json``: an inverted index shard with the postings
+  (page, section, weight) of every term starting with prefix, loaded
+  lazily for the terms that are searched;
+* ``search.js``: the search widget pages load when the index is enabled.
+
+The terms of every page are kept in ``index-state.json``, so an
+incremental build only tokenizes the pages it converted; shards are
+rebuilt from the stored terms and only written when they changed.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from html import unescape
+from pathlib import Path
+
+INDEX_DIRNAME = 'search'
+STATE_NAME = 'index-state.json'
+PAGES_NAME = 'pages.json'
+WIDGET_NAME = 'search.js'
+WIDGET_PATH = Path(__file__).resolve().parent / WIDGET_NAME
+STATE_VERSION = 1
+
+# Characters of a term that select its shard
+SHARD_PREFIX = 2
+SNIPPET_CHARS = 160
+# Terms in a heading count as much as this many mentions in the text
+HEADING_WEIGHT = 5
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 40
+STOP_WORDS = frozenset("""
+    a an and are as at be but by can do for from had has have how if in into is
+    it its not of on or our so than that the their them then there these they
+    this to was we were what when which who will with you your
+""".split())
+
+TERM_RE = re.compile(r'\w+')
+HEADING_RE = re.compile(r'<h([1-6])\b[^>]*?\bid=(["\'])(.*?)\2[^>]*>(.*?)</h\1\s*>',
+                        re.IGNORECASE | re.DOTALL)
+SKIP_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+TOC_RE = re.compile(r'<div class="table-of-contents">.*?</nav>\s*</div>', re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+# Removing inline tags leaves a space before punctuation that followed them
+PUNCTUATION_SPACE_RE = re.compile(r' ([,.;:!?)])')
+_SHARD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+
+
+def html_text(fragment):
+    """Visible text of an HTML fragment with whitespace collapsed"""
+    text = SPACE_RE.sub(' ', unescape(TAG_RE.sub(' ', fragment))).strip()
+    return PUNCTUATION_SPACE_RE.sub(r'\1', text)
+
+
+def tokenize(text):
+    """Yield the searchable terms of text; the widget tokenizes alike"""
+    for term in TERM_RE.findall(text.lower()):
+        if (MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH
+                and term not in STOP_WORDS and not term.isdigit()):
+            yield term
+
+
+def shard_name(term):
+    """Shard file of a term, named after its filename-safe prefix"""
+    prefix = ''.join(c if c in _SHARD_CHARS else f"_{ord(c):x}"
+                     for c in term[:SHARD_PREFIX])
+    return f"terms-{prefix}.json"
+
+
+class SectionCollector:
+    """Splits rendered HTML at headings and counts the terms of each section
+
+    feed() can be called with consecutive pieces of one document, as long
+    as no heading is cut in two, which the streaming path guarantees.
+    """
+
+    def __init__(self):
+        self.sections = []
+        self._start('', '')
+
+    def _start(self, anchor, heading):
+        self._section = {'anchor': anchor, 'heading': heading, 'snippet': '', 'terms': {}}
+        self.sections.append(self._section)
+        self._count(heading, HEADING_WEIGHT)
+
+    def _count(self, text, weight=1):
+        terms = self._section['terms']
+        for term in tokenize(text):
+            terms[term] = terms.get(term, 0) + weight
+
+    def _add_text(self, fragment):
+        text = html_text(fragment)
+        if not text:
+            return
+        self._count(text)
+        snippet = self._section['snippet']
+        if len(snippet) < SNIPPET_CHARS:
+            snippet = f"{snippet} {text}" if snippet else text
+            self._section['snippet'] = snippet[:SNIPPET_CHARS]
+
+    def feed(self, html):
+        html = SKIP_RE.sub(' ', html)
+        position = 0
+        for match in HEADING_RE.finditer(html):
+            self._add_text(html[position:match.start()])
+            self._start(unescape(match.group(3)), html_text(match.group(4)))
+            position = match.end()
+        self._add_text(html[position:])
+
+    def result(self):
+        """Sections that contain any searchable term"""
+        return [section for section in self.sections if section['terms']]
+
+    def title(self, default):
+        """The first heading of the document, which names it better than its file"""
+        return next((section['heading'] for section in self.sections if section['heading']),
+                    default)
+
+
+def sections_from_page(page):
+    """SectionCollector of a page written earlier, for pages indexed later"""
+    start = page.find('<div class="content">')
+    end = page.rfind('</div>')
+    body = page[start:end] if start != -1 and end > start else page
+    collector = SectionCollector()
+    collector.feed(TOC_RE.sub(' ', body, count=1))
+    return collector
+
+
+def _write_if_changed(path, text, digests):
+    """Write text unless the file already has it; returns True if written"""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    if digests.get(path.name) == digest and path.exists():
+        return False
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+    digests[path.name] = digest
+    return True
+
+
+class SearchIndex:
+    """The search index of one output directory, updated incrementally"""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.directory = self.output_dir / INDEX_DIRNAME
+        self.tokenized = 0
+        try:
+            with open(self.directory / STATE_NAME, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') != STATE_VERSION:
+                raise ValueError('old index')
+        except (OSError, ValueError):
+            state = {'version': STATE_VERSION, 'next_id': 0, 'pages': {}, 'files': {}}
+        self.state = state
+
+    def __contains__(self, source):
+        return self._key(source) in self.state['pages']
+
+    @staticmethod
+    def _key(source):
+        return os.path.normcase(os.path.abspath(source))
+
+    def _url(self, output):
+        return os.path.relpath(os.path.abspath(output), self.output_dir.resolve()).replace(
+            os.sep, '/')
+
+    def update(self, source, output, title, sections):
+        """Store the sections of a converted page"""
+        key = self._key(source)
+        entry = self.state['pages'].get(key)
+        page_id = entry['id'] if entry else self.state['next_id']
+        if entry is None:
+            self.state['next_id'] += 1
+        self.state['pages'][key] = {
+            'id': page_id,
+            'url': self._url(output),
+            'title': title,
+            'sections': sections,
+        }
+
+    def add_result(self, result):
+        """Index a ConversionResult; pages skipped as up to date are kept
+
+        A skipped page that is not in the index yet (for example after the
+        index was deleted) is tokenized from its written HTML.
+        """
+        if result.error or not result.output:
+            return
+        search = result.stats.get('search')
+        if search is not None:
+            self.update(result.source, result.output, search['title'], search['sections'])
+            self.tokenized += 1
+        elif result.source not in self:
+            try:
+                with open(result.output, 'r', encoding='utf-8') as f:
+                    collector = sections_from_page(f.read())
+            except OSError:
+                return
+            self.update(result.source, result.output,
+                        collector.title(Path(result.source).stem), collector.result())
+            self.tokenized += 1
+
+    def prune(self):
+        """Drop pages whose source or output no longer exists"""
+        pages = self.state['pages']
+        for key in [key for key, entry in pages.items()
+                    if not os.path.exists(key)
+                    or not (self.output_dir / entry['url']).exists()]:
+            del pages[key]
+
+    def save(self):
+        """Write pages.json, the changed shards and the widget"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        digests = self.state['files']
+        pages = [None] * self.state['next_id']
+        shards = {}
+        for entry in self.state['pages'].values():
+            page_id = entry['id']
+            pages[page_id] = [entry['url'], entry['title'], [
+                [section['anchor'], section['heading'], section['snippet']]
+                for section in entry['sections']
+            ]]
+            for number, section in enumerate(entry['sections']):
+                for term, weight in section['terms'].items():
+                    shard = shards.setdefault(shard_name(term), {})
+                    shard.setdefault(term, []).append([page_id, number, weight])
+
+        written = 0
+        for name, terms in shards.items():
+            for postings in terms.values():
+                postings.sort(key=lambda posting: (-posting[2], posting[0], posting[1]))
+            text = json.dumps(terms, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+            written += _write_if_changed(self.directory / name, text, digests)
+        for name in [name for name in digests if name.startswith('terms-')
+                     and name not in shards]:
+            (self.directory / name).unlink(missing_ok=True)
+            del digests[name]
+
+        _write_if_changed(self.directory / PAGES_NAME,
+                          json.dumps(pages, ensure_ascii=False, separators=(',', ':')),
+                          digests)
+        _write_if_changed(self.directory / WIDGET_NAME,
+                          WIDGET_PATH.read_text(encoding='utf-8'), digests)
+        state_path = self.directory / STATE_NAME
+        tmp_path = state_path.with_name(f"{STATE_NAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(self.state, ensure_ascii=False, separators=(',', ':')),
+                            encoding='utf-8')
+        os.replace(tmp_path, state_path)
+        return {
+            'pages': len(self.state['pages']),
+            'terms': sum(len(terms) for terms in shards.values()),
+            'shards': len(shards),
+            'shards_written': written,
+            'tokenized': self.tokenized,
+        }
@@ -0,0 +1,127 @@
+"""Site mode: mirror a documentation tree and link its pages together.
+
+A SiteMap is built once from every input of a batch.  Each source keeps
+its folder relative to the common root, so same-named READMEs in
+different folders no longer overwrite each other.  The map also serves as
+the link index: after rendering, relative links to Markdown files that
+are part of the site are rewritten to the generated pages in one regex
+pass over the HTML, keeping their #anchors (heading ids are the same in
+both).  Links to files outside the site are left alone.
+
+Worker processes receive the map once through activate(); the engine
+looks it up with active() when it picks output paths and rewrites links.
+"""
+import hashlib
+import os
+import re
+from html import escape, unescape
+from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
+
+INDEX_NAMES = ('README.md', 'readme.md', 'index.md')
+
+LINK_HREF_RE = re.compile(r'''(<a\b[^>]*?\bhref=)(["'])(.*?)\2''', re.IGNORECASE | re.DOTALL)
+
+_active = None
+
+
+def _key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def site_root(paths):
+    """Common folder of the given files and folders"""
+    folders = [os.path.abspath(p) if os.path.isdir(p) else os.path.dirname(os.path.abspath(p))
+               for p in paths]
+    return os.path.commonpath(folders) if folders else os.getcwd()
+
+
+class SiteMap:
+    """Output paths and link targets for every page of a site"""
+
+    def __init__(self, sources, output_dir, root=None, filename_pattern='{name}'):
+        sources = [str(source) for source in sources]
+        self.root = os.path.abspath(root) if root else site_root(sources)
+        self.output_dir = Path(output_dir)
+        self.filename_pattern = filename_pattern
+        self.pages = {}
+        for source in sources:
+            relative = os.path.relpath(os.path.abspath(source), self.root)
+            folder, name = os.path.split(relative)
+            filename = filename_pattern.format(name=os.path.splitext(name)[0]) + '.html'
+            self.pages[_key(source)] = Path(folder, filename).as_posix()
+        digest = hashlib.sha256()
+        for key, page in sorted(self.pages.items()):
+            digest.update(f"{os.path.relpath(key, _key(self.root))}\0{page}\n".encode('utf-8'))
+        # Pages link to each other, so any change to the page set rebuilds them
+        self.digest = digest.hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __contains__(self, source):
+        return _key(source) in self.pages
+
+    def output_path(self, source):
+        """Path of the page for source, mirroring its folder under output_dir"""
+        return self.output_dir / self.pages[_key(source)]
+
+    def prepare(self):
+        """Create every output folder once, before workers start writing"""
+        for folder in {os.path.dirname(page) for page in self.pages.values()}:
+            (self.output_dir / folder).mkdir(parents=True, exist_ok=True)
+
+    def _target(self, path):
+        """Page for a linked file, or for the README of a linked folder"""
+        page = self.pages.get(_key(path))
+        if page is None and os.path.isdir(path):
+            for name in INDEX_NAMES:
+                page = self.pages.get(_key(os.path.join(path, name)))
+                if page is not None:
+                    break
+        return page
+
+    def rewrite_links(self, html, source, stats=None):
+        """Point relative links to site sources at their pages
+
+        Runs over the rendered HTML once; nothing is parsed again.
+        """
+        page = self.pages.get(_key(source))
+        if page is None:
+            return html
+        source_dir = os.path.dirname(os.path.abspath(source))
+        page_dir = os.path.dirname(page) or '.'
+        rewritten = 0
+
+        def replace(match):
+            nonlocal rewritten
+            prefix, quote_char, href = match.groups()
+            url = urlsplit(unescape(href))
+            if url.scheme or url.netloc or not url.path or url.path.startswith('/'):
+                return match.group(0)
+            target = self._target(os.path.normpath(os.path.join(source_dir, unquote(url.path))))
+            if target is None:
+                return match.group(0)
+            new_href = quote(os.path.relpath(target, page_dir).replace(os.sep, '/'))
+            if url.query:
+                new_href += f"?{url.query}"
+            if url.fragment:
+                new_href += f"#{url.fragment}"
+            rewritten += 1
+            return f"{prefix}{quote_char}{escape(new_href)}{quote_char}"
+
+        html = LINK_HREF_RE.sub(replace, html)
+        if stats is not None:
+            stats['links'] = stats.get('links', 0) + rewritten
+        return html
+
+
+def activate(site):
+    """Use site for conversions in this process; None turns site mode off"""
+    global _active
+    _active = site
+
+
+def active():
+    """The SiteMap conversions in this process use, if any"""
+    return _active
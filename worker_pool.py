@@ -0,0 +1,248 @@
+"""Process pool with per-task time and memory limits.
+
+concurrent.futures cannot stop a single task: a worker stuck in one
+pathological file holds its slot until the file is done.  IsolatedPool
+runs every worker process under its own supervisor thread instead.  When
+a task outlives its time limit, or the worker dies (for example killed by
+the OS for using too much memory), the supervisor kills the process,
+starts a fresh one and retries the task once before failing it.  Other
+workers keep going meanwhile.
+
+Workers are not daemon processes, so a conversion may still split a large
+file across a process pool of its own.  Each worker leads a new process
+group; killing a worker kills that group, so no grandchild outlives it.
+
+The memory limit caps each worker's address space (RLIMIT_AS) above what
+it uses once started, so an oversized file raises MemoryError inside the
+worker instead of exhausting the machine.  Address space is not resident
+memory: it also counts mapped but untouched pages, such as shared
+libraries loaded later and thread stacks, so budgets need headroom beyond
+the resident size a file needs.  The initializer runs before the limit is
+set; it should import whatever the tasks load lazily.  The limit needs
+resource.setrlimit() and /proc, so it is only enforced on Linux.
+"""
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+from concurrent.futures import Executor, Future
+
+# Seconds a worker is given to exit before it is killed on shutdown
+STOP_TIMEOUT = 5
+
+
+class WorkerTimeout(Exception):
+    """A task did not finish within the time limit"""
+
+
+class WorkerCrashed(Exception):
+    """The worker process died while running a task"""
+
+
+def _address_space():
+    """Current virtual memory size of this process in bytes, if known"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def limit_memory(budget):
+    """Let this process allocate at most budget more bytes; True if enforced"""
+    try:
+        import resource
+    except ImportError:
+        return False
+    base = _address_space()
+    if base is None:
+        return False
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = base + budget
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        return False
+    return True
+
+
+def _worker_main(conn, memory_limit, initializer, initargs):
+    """Worker process loop: run (fn, args) tasks received over conn"""
+    if hasattr(os, 'setpgid'):
+        # Lead a process group, so a kill also reaches pools this worker starts
+        os.setpgid(0, 0)
+    if initializer is not None:
+        initializer(*initargs)
+    if memory_limit:
+        limit_memory(memory_limit)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        fn, args = task
+        try:
+            reply = (True, fn(*args))
+        except BaseException as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Results that cannot be pickled are reported, not lost
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe"""
+
+    def __init__(self, context, memory_limit, initializer, initargs):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit, initializer, initargs)
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        """Kill the worker and every process it started"""
+        if hasattr(os, 'killpg'):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        self.process.kill()
+
+    def stop(self, kill=False):
+        if not kill:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                kill = True
+            else:
+                self.process.join(STOP_TIMEOUT)
+        if kill or self.process.is_alive():
+            self.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class IsolatedPool(Executor):
+    """Executor whose workers are killed and replaced when a task overruns
+
+    timeout is the wall time in seconds one task may take; memory_limit the
+    bytes of address space a worker may add to its size after initializer
+    ran.  A task that
+    times out or kills its worker is retried up to retries times in a fresh
+    worker, then its future raises WorkerTimeout or WorkerCrashed.
+    """
+
+    def __init__(self, max_workers=1, timeout=None, memory_limit=None, retries=1,
+                 initializer=None, initargs=()):
+        self.timeout = timeout or None
+        self.memory_limit = memory_limit or None
+        self.retries = retries
+        self.timeouts = 0
+        self.crashes = 0
+        self.retried = 0
+        self._initializer = initializer
+        self._initargs = initargs
+        self._context = multiprocessing.get_context()
+        self._tasks = queue.Queue()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._supervisors = [
+            threading.Thread(target=self._supervise, name=f'isolated-worker-{n}', daemon=True)
+            for n in range(max(1, max_workers))
+        ]
+        for supervisor in self._supervisors:
+            supervisor.start()
+
+    def stats(self):
+        """Counters of tasks that timed out, crashed a worker or were retried"""
+        with self._lock:
+            return {'timeouts': self.timeouts, 'crashes': self.crashes,
+                    'retried': self.retried}
+
+    def submit(self, fn, *args, **kwargs):
+        if kwargs:
+            raise TypeError('IsolatedPool.submit() takes positional arguments only')
+        if self._shutdown:
+            raise RuntimeError('cannot submit after shutdown')
+        future = Future()
+        self._tasks.put((future, fn, args))
+        return future
+
+    def _spawn(self):
+        return _Worker(self._context, self.memory_limit, self._initializer, self._initargs)
+
+    def _supervise(self):
+        worker = None
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    return
+                future, fn, args = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                attempt = 0
+                while True:
+                    if worker is None:
+                        worker = self._spawn()
+                    try:
+                        worker.conn.send((fn, args))
+                        if worker.conn.poll(self.timeout):
+                            ok, value = worker.conn.recv()
+                            if ok:
+                                future.set_result(value)
+                            else:
+                                future.set_exception(value)
+                            break
+                        failure = WorkerTimeout, f"timed out after {self.timeout:g}s"
+                        counter = 'timeouts'
+                    except (EOFError, OSError):
+                        worker.process.join(STOP_TIMEOUT)
+                        failure = (WorkerCrashed,
+                                   f"worker exited with code {worker.process.exitcode}")
+                        counter = 'crashes'
+                    except Exception as e:
+                        # The task could not be sent, e.g. it does not pickle
+                        future.set_exception(e)
+                        break
+                    worker.stop(kill=True)
+                    worker = None
+                    with self._lock:
+                        setattr(self, counter, getattr(self, counter) + 1)
+                        if attempt < self.retries:
+                            self.retried += 1
+                    if attempt < self.retries:
+                        attempt += 1
+                        continue
+                    error, message = failure
+                    tries = 'once' if attempt == 0 else f"{attempt + 1} times"
+                    future.set_exception(error(f"{message} (tried {tries})"))
+                    break
+        finally:
+            if worker is not None:
+                worker.stop()
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._shutdown = True
+        if cancel_futures:
+            while True:
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if task is not None:
+                    task[0].cancel()
+        for _ in self._supervisors:
+            self._tasks.put(None)
+        if wait:
+            for supervisor in self._supervisors:
+                supervisor.join()